@@ -0,0 +1,84 @@
+"""Compare abstract reconstruction from OpenAlex inverted indexes against the old sort-based version.
+
+The corpus is any OpenAlex works response saved as JSON ({"results": [...]}) or a plain
+list of works. It defaults to the responses in fixtures/openalex/. Use --download to
+save a corpus of real abstracts (OpenAlex data is CC0) for later offline runs.
+
+Usage:
+    uv run python benchmarks/bench_abstract.py [--corpus PATH ...] [--repeat N]
+    uv run python benchmarks/bench_abstract.py --download corpus.json --query "machine learning" --count 1000
+"""
+import argparse
+import json
+import statistics
+import timeit
+from datetime import date
+from pathlib import Path
+
+from myfeed.fetch import create_session
+from myfeed.openalex import iter_pages, reconstruct_abstract, search_params
+
+FIXTURES = Path(__file__).parent / "fixtures" / "openalex"
+
+
+def sort_based(inverted_index, max_chars=1000):
+    """The previous implementation: sort every (position, word) pair, join, then truncate."""
+    word_positions = []
+    for word, positions in inverted_index.items():
+        for pos in positions:
+            word_positions.append((pos, word))
+    word_positions.sort(key=lambda x: x[0])
+    abstract = " ".join([word for _, word in word_positions])
+    return abstract[:max_chars]
+
+
+def load_indexes(paths):
+    indexes = []
+    for path in paths:
+        data = json.loads(Path(path).read_text())
+        works = data["results"] if isinstance(data, dict) else data
+        indexes += [work["abstract_inverted_index"] for work in works if work.get("abstract_inverted_index")]
+    return indexes
+
+
+def download(path, query, count):
+    session = create_session()
+    params = dict(search_params(query, date(1900, 1, 1)), select="id,abstract_inverted_index",
+                  filter="has_abstract:true")
+    works = [work for page in iter_pages(session, params, page_size=200, budget=count) for work in page]
+    Path(path).write_text(json.dumps(works))
+    print(f"Saved {len(works)} works to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", nargs="*", default=sorted(FIXTURES.glob("*.json")), help="Saved works responses")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the corpus per measurement")
+    parser.add_argument("--download", help="Fetch real abstracts from OpenAlex into this file and exit")
+    parser.add_argument("--query", default="machine learning", help="Search used with --download")
+    parser.add_argument("--count", type=int, default=1000, help="Works fetched with --download")
+    args = parser.parse_args()
+
+    if args.download:
+        download(args.download, args.query, args.count)
+        return
+
+    indexes = load_indexes(args.corpus)
+    words = [sum(len(positions) for positions in index.values()) for index in indexes]
+    print(f"{len(indexes)} abstracts, {statistics.median(words):.0f} words median, {max(words)} max\n")
+
+    mismatches = sum(reconstruct_abstract(index) != sort_based(index) for index in indexes)
+    print(f"Outputs differing from the sort-based version: {mismatches}\n")
+
+    print(f"{'max_chars':>9}  {'sort-based us':>13}  {'slots us':>9}  {'speedup':>7}")
+    for max_chars in (300, 1000, 10 ** 9):
+        old = timeit.timeit(lambda: [sort_based(index, max_chars) for index in indexes], number=args.repeat)
+        new = timeit.timeit(lambda: [reconstruct_abstract(index, max_chars) for index in indexes],
+                            number=args.repeat)
+        per_abstract = args.repeat * len(indexes) / 1e6
+        label = "all" if max_chars == 10 ** 9 else max_chars
+        print(f"{label:>9}  {old / per_abstract:>13.1f}  {new / per_abstract:>9.1f}  {old / new:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Micro-benchmark of the HTML-to-text engines on stored article pages.
+
+Times each engine alone on the whole page, then the full fetch_article_text path the
+agent runs: streaming the page from an in-memory transport, deciding when to stop
+reading, and extracting the text.
+
+Usage:
+    uv run python benchmarks/bench_extract.py [--repeat N] [--max-chars N]
+"""
+import argparse
+import importlib.util
+import io
+import timeit
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from myfeed.extract import ENGINES, fetch_article_text, get_engine
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+
+class PageAdapter(HTTPAdapter):
+    """Serves the stored pages from memory, keyed by URL path, so only parsing is timed."""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        body = self.pages[request.path_url.strip("/")].encode()
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({"Content-Type": "text/html; charset=utf-8"})
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="Runs per engine and page")
+    parser.add_argument("--max-chars", type=int, default=1000, help="Characters kept, as in the agent")
+    args = parser.parse_args()
+
+    pages = {path.stem: path.read_text() for path in sorted(FIXTURES.glob("*.html"))}
+    engines = [name for name in ENGINES if name in ("stdlib", "bs4") or importlib.util.find_spec(name)]
+    print(f"Default engine: {get_engine('auto').name}\n")
+
+    session = requests.Session()
+    session.mount("https://", PageAdapter(pages))
+
+    print(f"{'page':<16}{'size':>9}  {'engine':<12}{'extract ms':>10}  {'fetch path ms':>13}  {'chars':>6}  preview")
+    for page, html in pages.items():
+        for name in engines:
+            engine = get_engine(name)
+            seconds = timeit.timeit(lambda: engine.extract(html), number=args.repeat) / args.repeat
+            url = f"https://bench.local/{page}"
+            fetch = timeit.timeit(lambda: fetch_article_text(session, url, max_chars=args.max_chars, engine=engine),
+                                  number=args.repeat) / args.repeat
+            text = fetch_article_text(session, url, max_chars=args.max_chars, engine=engine)
+            print(f"{page:<16}{len(html):>9}  {name:<12}{seconds * 1000:>10.2f}  {fetch * 1000:>13.2f}  "
+                  f"{len(text):>6}  {text[:40]!r}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Time NewsAgent.generate_newsletter end to end and per node, fully offline.
+
+Feeds, article pages and OpenAlex responses are replayed from fixtures/ through a
+requests transport adapter, and the Mistral model is replaced by a deterministic stub,
+both with a configurable latency. Each scale factor multiplies the number of news and
+positive news sources.
+
+Usage:
+    uv run python benchmarks/bench_pipeline.py [--scales 1,10,100] [--llm-latency S] [--http-latency S]
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import re
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from myfeed.agent import NewsAgent
+from myfeed.config import AgentConfig
+
+FIXTURES = Path(__file__).parent / "fixtures"
+RECORDED_ON = date(2026, 10, 16)  # OpenAlex publication dates are shifted by the fixtures' age
+TOPICS = ["machine learning", "drug discovery", "renewable energy"]
+NODES = ["scrape_positive_news", "scrape_news", "scrape_papers", "filter_articles", "filter_papers",
+         "generate_newsletter"]
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Answers every request from the local fixtures after a fixed delay, without touching the network."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.feeds = {path.stem: path.read_text() for path in (FIXTURES / "feeds").glob("*.xml")}
+        self.pages = [path.read_bytes() for path in sorted((FIXTURES / "html").glob("*.html"))]
+        shift = (date.today() - RECORDED_ON).days
+        self.works = {path.stem: self._shift_dates(path.read_text(), shift)
+                      for path in (FIXTURES / "openalex").glob("*.json")}
+
+    @staticmethod
+    def _shift_dates(text: str, days: int) -> list:
+        works = json.loads(text)["results"]
+        for work in works:
+            published = date.fromisoformat(work["publication_date"]) + timedelta(days=days)
+            work["publication_date"] = published.isoformat()
+            work["publication_year"] = published.year
+        return works
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        time.sleep(self.latency)
+        parts = urlsplit(request.url)
+        if parts.hostname == "api.openalex.org":
+            return self._response(request, self._search(parse_qs(parts.query)), "application/json")
+        feed = re.fullmatch(r"/feeds/(\w+)-(\d+)\.xml", parts.path)
+        if feed:
+            body = self.feeds[feed.group(1)].replace("{source}", feed.group(2)).encode()
+            return self._response(request, body, "application/rss+xml")
+        # Article pages: a stable pick among the stored HTML pages
+        page = int(hashlib.md5(parts.path.encode()).hexdigest(), 16) % len(self.pages)
+        return self._response(request, self.pages[page], "text/html; charset=utf-8")
+
+    def _search(self, params: dict) -> bytes:
+        # Combined searches look like "(topic a) OR (topic b)"
+        query = params.get("search", [""])[0]
+        topics = [topic.strip("() ").replace(" ", "_") for topic in query.split(" OR ")]
+        works = [work for topic in topics if topic in self.works for work in self.works[topic]]
+        for condition in params.get("filter", [""])[0].split(","):
+            if condition.startswith("from_publication_date:"):
+                since = condition.split(":", 1)[1]
+                works = [work for work in works if work["publication_date"] >= since]
+        if "select" in params:
+            fields = params["select"][0].split(",")
+            works = [{field: work[field] for field in fields if field in work} for work in works]
+        # Cursor pagination, with the offset as the cursor
+        per_page = int(params.get("per_page", ["25"])[0])
+        cursor = params.get("cursor", ["*"])[0]
+        start = 0 if cursor == "*" else int(cursor)
+        next_cursor = str(start + per_page) if start + per_page < len(works) else None
+        return json.dumps({"meta": {"next_cursor": next_cursor}, "results": works[start:start + per_page]}).encode()
+
+    def _response(self, request, body: bytes, content_type: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({"Content-Type": content_type, "Content-Length": str(len(body))})
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.connection = self
+        return response
+
+
+class Reply:
+    def __init__(self, content: str):
+        self.content = content
+        self.usage_metadata = None
+
+
+class StubLLM:
+    """Deterministic stand-in for ChatMistralAI: scores are a hash of the item title."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    @staticmethod
+    def _score(title: str) -> int:
+        return int(hashlib.md5(title.encode()).hexdigest(), 16) % 11
+
+    def invoke(self, prompt: str) -> Reply:
+        time.sleep(self.latency)
+        items = re.findall(r"\[(\d+)\]\s+(?:Article|Paper) Title: (.*)", prompt)
+        if items:
+            return Reply(json.dumps([
+                {"id": int(item_id), "relevance_score": self._score(title), "summary": f"Summary of {title}"}
+                for item_id, title in items
+            ]))
+        title = re.search(r"(?:Article|Paper) Title: (.*)", prompt)
+        if title is None:
+            return Reply("Hey Matthieu, here's what stands out today.")
+        title = title.group(1)
+        return Reply(json.dumps({"relevance_score": self._score(title), "summary": f"Summary of {title}"}))
+
+    def with_structured_output(self, schema):
+        return StructuredStub(self.latency, schema)
+
+
+class StructuredStub:
+    """Returns an empty newsletter: enough to time the call, not to check its content."""
+
+    def __init__(self, latency: float, schema):
+        self.latency = latency
+        self.schema = schema
+
+    def invoke(self, prompt: str):
+        time.sleep(self.latency)
+        return self.schema(introduction="Hey Matthieu", positive_news=[], latest_news=[], todays_papers=[],
+                           recent_papers=[], closing_note="That's it for today.")
+
+
+def run(scale: int, args) -> dict:
+    config = AgentConfig(
+        llm_requests_per_second=args.llm_rate,
+        llm_max_concurrency=args.llm_concurrency,
+        score_batch_size=args.batch_size,
+        newsletter_mode=args.newsletter_mode,
+        prefilter_top_k=args.prefilter_top_k,
+        openalex_combined_search=args.combined_paper_search,
+        paper_page_size=args.paper_page_size,
+        paper_budget=args.paper_budget,
+        paper_stream=args.paper_stream,
+    )
+    agent = NewsAgent(mistral_api_key="offline", config=config)
+    agent.session.mount("https://", ReplayAdapter(args.http_latency))
+    agent.session.mount("http://", ReplayAdapter(args.http_latency))
+    agent.news_sources = [f"https://bench.local/feeds/tech-{i}.xml" for i in range(5 * scale)]
+    agent.positive_news_sources = [f"https://bench.local/feeds/positive-{i}.xml" for i in range(5 * scale)]
+    agent.llm = agent.scorer.llm = StubLLM(args.llm_latency)
+
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        content = agent.generate_newsletter(TOPICS)
+        elapsed = time.perf_counter() - started
+
+    report = agent.metrics.report()
+    report["scale"] = scale
+    report["total_seconds"] = elapsed
+    report["newsletter_chars"] = len(content)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated source multipliers")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="Seconds per stub LLM call")
+    parser.add_argument("--http-latency", type=float, default=0.01, help="Seconds per replayed HTTP request")
+    parser.add_argument("--llm-rate", type=float, default=0, help="LLM requests per second (0: unlimited)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Concurrent LLM calls")
+    parser.add_argument("--batch-size", type=int, default=1, help="Items rated per LLM request")
+    parser.add_argument("--prefilter-top-k", type=int, default=0, help="BM25 prefilter top K (0: off)")
+    parser.add_argument("--combined-paper-search", action="store_true", help="One OpenAlex query for all topics")
+    parser.add_argument("--paper-page-size", type=int, default=10, help="OpenAlex works per page")
+    parser.add_argument("--paper-budget", type=int, default=10, help="OpenAlex works fetched per topic at most")
+    parser.add_argument("--paper-stream", action="store_true", help="Score papers page by page, stopping early")
+    parser.add_argument("--newsletter-mode", choices=["llm", "direct"], default="direct")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    parser.add_argument("--json", help="Also write the full per-scale reports to this file")
+    args = parser.parse_args()
+
+    reports = [run(int(scale), args) for scale in args.scales.split(",")]
+
+    print(f"{'scale':>5}  {'total s':>8}  " + "  ".join(f"{node[:14]:>14}" for node in NODES)
+          + f"  {'LLM calls':>9}  {'HTTP calls':>10}  {'peak RSS MB':>11}")
+    for report in reports:
+        nodes = "  ".join(f"{report['nodes'].get(node, {}).get('wall_seconds', 0):>14.3f}" for node in NODES)
+        calls = report["calls"]
+        http = sum(calls.get(kind, {}).get("count", 0) for kind in ("feed", "article", "openalex"))
+        print(f"{report['scale']:>5}x  {report['total_seconds']:>7.2f}  {nodes}  "
+              f"{calls.get('llm', {}).get('count', 0):>9}  {http:>10}  {report['peak_rss_bytes'] / 2**20:>11.1f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
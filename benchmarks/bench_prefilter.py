@@ -0,0 +1,54 @@
+"""Measure how many LLM calls the BM25 prefilter saves and how much recall it loses.
+
+Uses the hand-labelled items in fixtures/prefilter_labeled.json; recall is the share
+of items labelled relevant that the prefilter still passes on to the LLM.
+
+Usage:
+    uv run python benchmarks/bench_prefilter.py [--scale N]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from myfeed.prefilter import bm25_scores, select_candidates
+
+FIXTURE = Path(__file__).parent / "fixtures" / "prefilter_labeled.json"
+SETTINGS = [(1, 0.0), (2, 0.0), (3, 0.0), (5, 0.0), (0, 0.5), (0, 1.0), (3, 1.0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100, help="Replicate the corpus N times for the timing run")
+    args = parser.parse_args()
+
+    fixture = json.loads(FIXTURE.read_text())
+    topics = fixture["topics"]
+    items = fixture["items"]
+    documents = [f"{item['title']} {item['summary']}" for item in items]
+    relevant = {i for i, item in enumerate(items) if item["relevant"]}
+    scores = bm25_scores(documents, topics)
+
+    print(f"{len(items)} items, {len(relevant)} labelled relevant, topics: {', '.join(topics)}\n")
+    print(f"{'top_k':>5}  {'min_score':>9}  {'sent':>4}  {'saved':>5}  {'recall':>6}  {'precision':>9}")
+    for top_k, min_score in SETTINGS:
+        kept = set(select_candidates(scores, top_k, min_score))
+        recall = len(kept & relevant) / len(relevant)
+        precision = len(kept & relevant) / len(kept) if kept else 0.0
+        print(f"{top_k:>5}  {min_score:>9.1f}  {len(kept):>4}  {len(items) - len(kept):>5}  "
+              f"{recall:>6.0%}  {precision:>9.0%}")
+
+    missed = [items[i]["title"] for i in sorted(relevant - set(select_candidates(scores, 0, 0.5)))]
+    print("\nRelevant items without any topic keyword (lost at min_score=0.5):")
+    for title in missed:
+        print(f"  - {title}")
+
+    large = documents * args.scale
+    started = time.perf_counter()
+    bm25_scores(large, topics)
+    elapsed = time.perf_counter() - started
+    print(f"\nScoring {len(large)} documents against {len(topics)} topics took {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Time the newsletter Markdown-to-HTML rendering at growing newsletter sizes.
+
+Compares render_markdown (myfeed/email_sender.py) with the previous chain of regex
+passes, on newsletters built by NewsletterContent.format with 1x, 10x and 100x the
+usual number of items. Linear scaling shows as a constant time per KB. The last
+column renders the HTML part straight from the NewsletterContent (myfeed/rendering.py),
+which is what the email sender does for generated newsletters.
+
+Usage:
+    uv run python benchmarks/bench_render.py [--scales 1,10,100] [--repeat N]
+"""
+import argparse
+import re
+import timeit
+
+from myfeed.email_sender import render_markdown
+from myfeed.models import NewsletterContent, StructuredArticle, StructuredPaper
+from myfeed.rendering import render_html
+
+
+def legacy_render(content):
+    """The previous EmailSender._convert_to_html body, without the page template."""
+    formatted_content = re.sub(r'^---+\s*$', r'<hr>', content, flags=re.MULTILINE)
+    formatted_content = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', formatted_content, flags=re.MULTILINE)
+    formatted_content = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', formatted_content, flags=re.MULTILINE)
+    formatted_content = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', formatted_content, flags=re.MULTILINE)
+    formatted_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', formatted_content)
+    formatted_content = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', r'<a href="\2">\1</a>', formatted_content)
+    section = r'(\d+\.\s+<strong>.*?</strong>.*?)(?=\d+\.\s+<strong>|\Z)'
+    formatted_content = re.sub(r'(## Recent Papers.*?)(?=## |\Z)',
+                               lambda m: re.sub(section, r'<div class="paper">\1</div>', m.group(1), flags=re.DOTALL),
+                               formatted_content, flags=re.DOTALL)
+    formatted_content = re.sub(r'(## Positive News.*?)(?=## Tech News|## |\Z)',
+                               lambda m: re.sub(section, r'<div class="positive-article">\1</div>', m.group(1),
+                                                flags=re.DOTALL),
+                               formatted_content, flags=re.DOTALL)
+    formatted_content = re.sub(r'(## Tech News.*?)(?=## Today|## Recent Papers|## |\Z)',
+                               lambda m: re.sub(section, r'<div class="article">\1</div>', m.group(1),
+                                                flags=re.DOTALL),
+                               formatted_content, flags=re.DOTALL)
+    formatted_content = formatted_content.replace('\n\n', '</p><p>')
+    formatted_content = '<p>' + formatted_content + '</p>'
+    formatted_content = formatted_content.replace('\n', '<br>')
+    formatted_content = formatted_content.replace('<p></p>', '')
+    return formatted_content.replace('<p><br>', '<p>')
+
+
+def newsletter(scale):
+    article = StructuredArticle(
+        title="Grid-scale battery project comes online ahead of schedule", source="Bench Tech Daily",
+        summary="The installation can power a mid-sized city for four hours at peak demand. " * 3,
+        url="https://bench.local/articles/battery?utm_source=rss", relevance_score=8.0)
+    paper = StructuredPaper(
+        title="Grid storage with hybrid flow batteries", authors="Ana Silva, Wei Chen, Fatima Khan et al.",
+        year="2026", citations="12", summary="We propose a novel method for grid storage. " * 6,
+        url="https://doi.org/10.5555/bench.1", relevance_score=9.0)
+    return NewsletterContent(
+        introduction="Hey Matthieu, here's your daily list of positive news and selected papers and articles "
+                     "on your topics of interest:",
+        positive_news=[article] * 5 * scale, latest_news=[article] * 6 * scale,
+        todays_papers=[paper] * 3 * scale, recent_papers=[paper] * 3 * scale,
+        closing_note="That's it for today. See you tomorrow!")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated newsletter size multipliers")
+    parser.add_argument("--repeat", type=int, default=20, help="Renders per measurement")
+    args = parser.parse_args()
+
+    print(f"{'scale':>5}  {'KB':>7}  {'regex passes ms':>15}  {'one pass ms':>11}  {'us/KB old':>9}  {'us/KB new':>9}"
+          f"  {'structured ms':>13}")
+    for scale in map(int, args.scales.split(",")):
+        structured = newsletter(scale)
+        content = structured.format()
+        assert render_markdown(content) == legacy_render(content)
+        repeat = max(1, args.repeat // scale)
+        old = timeit.timeit(lambda: legacy_render(content), number=repeat) / repeat
+        new = timeit.timeit(lambda: render_markdown(content), number=repeat) / repeat
+        direct = timeit.timeit(lambda: render_html(structured), number=repeat) / repeat
+        kb = len(content) / 1024
+        print(f"{scale:>4}x  {kb:>7.1f}  {old * 1000:>15.2f}  {new * 1000:>11.2f}  "
+              f"{old * 1e6 / kb:>9.1f}  {new * 1e6 / kb:>9.1f}  {direct * 1000:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
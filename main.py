@@ -6,7 +6,7 @@ import os
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from myfeed.generator import NewsletterGenerator
+from myfeed.config import AgentConfig
 from myfeed.email_sender import EmailSender
 
 def main():
@@ -24,20 +24,57 @@ def main():
     parser.add_argument('--email-password', required=True,
                        help='Email password')
     parser.add_argument('--to-email', required=True,
-                       help='Recipient email address')
+                       help='Recipient email address, or several separated by commas')
     parser.add_argument('--topics', default="",
                        help='Comma-separated list of topics')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Directory for persistent caches (default: caching disabled)')
+    parser.add_argument('--batch-size', type=int, default=None,
+                       help='Articles/papers rated per LLM request (default: 1)')
+    parser.add_argument('--prefilter-top-k', type=int, default=None,
+                       help='Only send the K best keyword matches per topic to the LLM (default: off)')
+    parser.add_argument('--newsletter-mode', choices=['llm', 'direct'], default=None,
+                       help='Have the LLM rewrite the newsletter, or build it directly from the selected items (default: llm)')
+    parser.add_argument('--llm-intro', action='store_true',
+                       help='In direct mode, have the LLM write a short introduction')
+    parser.add_argument('--combined-paper-search', action='store_true',
+                       help='Search OpenAlex once for all topics instead of once per topic')
+    parser.add_argument('--metrics-json', default=None,
+                       help='Write a JSON report of per-step timings, bytes and tokens to this path')
+    parser.add_argument('--metrics-textfile', default=None,
+                       help='Write the same report in Prometheus text format to this path')
+    parser.add_argument('--no-starttls', action='store_true',
+                       help='Talk plain SMTP without STARTTLS, e.g. to a local relay')
     
     args = parser.parse_args()
     
     # Convert topics string to list
     topics_list = [topic.strip() for topic in args.topics.split(",") if topic.strip()]
+
+    config = AgentConfig()
+    if args.cache_dir:
+        config.cache_dir = args.cache_dir
+    if args.batch_size:
+        config.score_batch_size = args.batch_size
+    if args.prefilter_top_k:
+        config.prefilter_top_k = args.prefilter_top_k
+    if args.newsletter_mode:
+        config.newsletter_mode = args.newsletter_mode
+    if args.llm_intro:
+        config.newsletter_llm_intro = True
+    if args.combined_paper_search:
+        config.openalex_combined_search = True
+    if args.metrics_json:
+        config.metrics_json = args.metrics_json
+    if args.metrics_textfile:
+        config.metrics_textfile = args.metrics_textfile
     
     if args.command == 'config':
         print("Current Configuration:")
         print(f"Topics: {', '.join(topics_list)}")
         print(f"Email: {args.to_email}")
         print(f"SMTP Server: {args.smtp_server}:{args.smtp_port}")
+        print(f"Cache Directory: {config.cache_dir or 'disabled'}")
         return
     
     if args.command == 'test':
@@ -47,37 +84,48 @@ def main():
             smtp_port=args.smtp_port,
             email_address=args.email_address,
             email_password=args.email_password,
-            to_email=args.to_email
+            to_email=args.to_email,
+            use_tls=not args.no_starttls
         )
-        if email_sender.test_email_connection():
-            print("✓ Email connection successful")
-            
-            # Test newsletter generation and sending
-            print("Generating test newsletter...")
-            generator = NewsletterGenerator(
-                mistral_api_key=args.mistral_api_key,
-                email_sender=email_sender,
-                topics=topics_list
-            )
-            generator.run()
-        else:
-            print("✗ Email connection failed")
-            print("Please check your email configuration")
+        try:
+            if email_sender.test_email_connection():
+                print("✓ Email connection successful")
+
+                # Test newsletter generation and sending
+                print("Generating test newsletter...")
+                # Imported here: the agent's dependencies take seconds to load
+                from myfeed.generator import NewsletterGenerator
+                generator = NewsletterGenerator(
+                    mistral_api_key=args.mistral_api_key,
+                    email_sender=email_sender,
+                    topics=topics_list,
+                    config=config
+                )
+                generator.run()
+            else:
+                print("✗ Email connection failed")
+                print("Please check your email configuration")
+        finally:
+            # The spool delivers over its own connections, so the probe's may never be reused
+            email_sender.close()
         return
     
     if args.command == 'run-once':
         print("Generating and sending newsletter...")
+        from myfeed.generator import NewsletterGenerator
         email_sender = EmailSender(
             smtp_server=args.smtp_server,
             smtp_port=args.smtp_port,
             email_address=args.email_address,
             email_password=args.email_password,
-            to_email=args.to_email
+            to_email=args.to_email,
+            use_tls=not args.no_starttls
         )
         generator = NewsletterGenerator(
             mistral_api_key=args.mistral_api_key,
             email_sender=email_sender,
-            topics=topics_list
+            topics=topics_list,
+            config=config
         )
         generator.run()
         return
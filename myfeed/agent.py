@@ -1,123 +1,131 @@
-from typing import List, Dict, Any
-import requests
-from bs4 import BeautifulSoup
-import feedparser
-from langchain_mistralai import ChatMistralAI
-from langchain_core.prompts import ChatPromptTemplate
-from langgraph.graph import StateGraph, END
+from typing import Annotated, List, Dict, Any, Iterator, Optional, Set, Tuple
 from pydantic import BaseModel
+import hashlib
 import json
+import operator
+import threading
 import traceback
-from datetime import datetime
-
-class NewsItem(BaseModel):
-    title: str
-    summary: str
-    url: str
-    source: str
-    relevance_score: float
-
-class PaperItem(BaseModel):
-    title: str
-    authors: str
-    summary: str
-    url: str
-    year: str
-    citations: str
-    relevance_score: float
-    publication_date: str = ""  # Full publication date (YYYY-MM-DD)
-
-class StructuredArticle(BaseModel):
-    title: str
-    source: str
-    summary: str
-    url: str
-    relevance_score: float
-
-class StructuredPaper(BaseModel):
-    title: str
-    authors: str
-    year: str
-    citations: str
-    summary: str
-    url: str
-    relevance_score: float
-
-class NewsletterContent(BaseModel):
-    """Structured output for newsletter generation with separate sections for consistent formatting."""
-    introduction: str
-    positive_news: List[StructuredArticle]
-    latest_news: List[StructuredArticle]
-    todays_papers: List[StructuredPaper]
-    recent_papers: List[StructuredPaper]
-    closing_note: str
-    
-    def format(self) -> str:
-        """Format the newsletter content as a properly structured string."""
-        sections = []
-
-        # Introduction
-        sections.append(self.introduction)
-        sections.append("")
-
-        # Positive News section (FIRST)
-        if self.positive_news:
-            sections.append("## Positive News")
-            sections.append("")
-            for i, article in enumerate(self.positive_news, 1):
-                sections.append(f"{i}. **{article.title}** (Score: {article.relevance_score})")
-                sections.append(f"   Source: {article.source}")
-                sections.append(f"   Summary: {article.summary}")
-                sections.append(f"   [Read more]({article.url})")
-                sections.append("")
-
-        # Tech News section (renamed from Latest News)
-        if self.latest_news:
-            sections.append("## Tech News")
-            sections.append("")
-            for i, article in enumerate(self.latest_news, 1):
-                sections.append(f"{i}. **{article.title}** (Score: {article.relevance_score})")
-                sections.append(f"   Source: {article.source}")
-                sections.append(f"   Summary: {article.summary}")
-                sections.append(f"   [Read more]({article.url})")
-                sections.append("")
-        
-        # Today's Papers section
-        sections.append("## Today's Papers")
-        sections.append("")
-        if self.todays_papers:
-            for i, paper in enumerate(self.todays_papers, 1):
-                sections.append(f"{i}. **{paper.title}** (Score: {paper.relevance_score})")
-                sections.append(f"   Authors: {paper.authors}")
-                sections.append(f"   Year: {paper.year}")
-                sections.append(f"   Citations: {paper.citations}")
-                sections.append(f"   Summary: {paper.summary}")
-                sections.append(f"   [Read paper]({paper.url})")
-                sections.append("")
-        else:
-            sections.append("No papers published today.")
-            sections.append("")
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from .cache import DiskCache, SeenStore
+from .config import AgentConfig
+from .extract import fetch_article_text, get_engine
+from .fetch import FeedFetcher, canonical_url, create_session
+from .metrics import RunMetrics
+from .models import NewsItem, NewsletterContent, PaperItem, StructuredArticle, StructuredPaper
+from .openalex import iter_pages, normalize_doi, reconstruct_abstract, search_params
+from .scoring import ScoringExecutor, estimate_tokens, parse_batch_results, plan_batches
+
+NEWS_SOURCES = [
+    "https://feeds.feedburner.com/oreilly/radar",
+    "https://techcrunch.com/feed/",
+    "https://feeds.arstechnica.com/arstechnica/index",
+    "https://www.wired.com/feed/rss",
+    "https://feeds.feedburner.com/venturebeat/SZYF",
+]
+
+POSITIVE_NEWS_SOURCES = [
+    "https://www.goodnewsnetwork.org/feed/",
+    "https://www.positive.news/feed/",
+    "https://www.goodnewsnetwork.org/category/news/world/feed/",
+    "https://www.goodnewsnetwork.org/category/news/science/feed/",
+    "https://www.euronews.com/green/rss",
+]
+
+ARTICLE_FILTER_TEMPLATE = """
+        You are a newsletter curator. Given these topics of interest: {topics}
         
-        # Recent Papers section
-        sections.append("## Recent Papers (Last 2 Weeks)")
-        sections.append("")
-        if self.recent_papers:
-            for i, paper in enumerate(self.recent_papers, 1):
-                sections.append(f"{i}. **{paper.title}** (Score: {paper.relevance_score})")
-                sections.append(f"   Authors: {paper.authors}")
-                sections.append(f"   Year: {paper.year}")
-                sections.append(f"   Citations: {paper.citations}")
-                sections.append(f"   Summary: {paper.summary}")
-                sections.append(f"   [Read paper]({paper.url})")
-                sections.append("")
-        else:
-            sections.append("No recent papers found in the last 2 weeks.")
-            sections.append("")
+        Rate the relevance of this article on a scale of 0-10 and provide a concise summary.
         
-        # Closing
-        sections.append(self.closing_note)
+        Article Title: {title}
+        Article Summary: {summary}
+        Article Content: {content}
         
-        return "\n".join(sections)
+        Respond in JSON format:
+        {{
+            "relevance_score": <score>,
+            "summary": "<your_summary>",
+            "reasoning": "<brief_reasoning>"
+        }}
+        """
+
+PAPER_FILTER_TEMPLATE = """
+        You are an academic newsletter curator. Given these topics of interest: {topics}
+
+        Rate the relevance of this research paper on a scale of 0-10 and provide a concise academic summary.
+
+        Paper Title: {title}
+        Authors: {authors}
+        Abstract/Summary: {summary}
+        Citations: {citations}
+
+        Respond in JSON format:
+        {{
+            "relevance_score": <score>,
+            "summary": "<academic_summary>",
+            "reasoning": "<brief_reasoning>"
+        }}
+        """
+
+ARTICLE_BATCH_TEMPLATE = """
+        You are a newsletter curator. Given these topics of interest: {topics}
+
+        Rate the relevance of each article below on a scale of 0-10 and provide a concise summary of it.
+
+        {items}
+
+        Respond with a JSON list holding one object per article, using the article's id:
+        [
+            {{"id": <id>, "relevance_score": <score>, "summary": "<your_summary>"}}
+        ]
+        """
+
+ARTICLE_ITEM_TEMPLATE = """[{id}]
+        Article Title: {title}
+        Article Summary: {summary}
+        Article Content: {content}"""
+
+PAPER_BATCH_TEMPLATE = """
+        You are an academic newsletter curator. Given these topics of interest: {topics}
+
+        Rate the relevance of each research paper below on a scale of 0-10 and provide a concise academic summary of it.
+
+        {items}
+
+        Respond with a JSON list holding one object per paper, using the paper's id:
+        [
+            {{"id": <id>, "relevance_score": <score>, "summary": "<academic_summary>"}}
+        ]
+        """
+
+PAPER_ITEM_TEMPLATE = """[{id}]
+        Paper Title: {title}
+        Authors: {authors}
+        Abstract/Summary: {summary}
+        Citations: {citations}"""
+
+FILTER_PROMPTS = {
+    "article": {"single": ARTICLE_FILTER_TEMPLATE, "batch": ARTICLE_BATCH_TEMPLATE, "item": ARTICLE_ITEM_TEMPLATE},
+    "paper": {"single": PAPER_FILTER_TEMPLATE, "batch": PAPER_BATCH_TEMPLATE, "item": PAPER_ITEM_TEMPLATE},
+}
+
+SUMMARY_TOKENS = 120  # Output budgeted per item in a batch response
+
+NEWSLETTER_MODES = ("llm", "direct")
+
+INTRODUCTION = "Hey Matthieu, here's your daily list of positive news and selected papers and articles on your topics of interest:"
+CLOSING_NOTE = "That's it for today. See you tomorrow!"
+
+INTRO_TEMPLATE = """
+        Write a short and friendly introduction (two sentences at most) for today's newsletter on these topics: {topics}
+
+        Today's date: {date}
+
+        Start with "Hey Matthieu," and mention what stands out in today's headlines:
+        {headlines}
+
+        Respond with the introduction only.
+        """
 
 class NewsletterState(BaseModel):
     topics: List[str]
@@ -130,32 +138,83 @@ class NewsletterState(BaseModel):
     today_papers: List[PaperItem] = []  # Papers from today
     recent_papers: List[PaperItem] = []  # Papers from last 2 weeks
     newsletter_content: str = ""
+    newsletter: Optional[NewsletterContent] = None  # Structured form of newsletter_content, for rendering
+    # Seen-store keys of every item processed in this run, concatenated across parallel branches
+    new_item_keys: Annotated[List[str], operator.add] = []
 
 class NewsAgent:
-    def __init__(self, mistral_api_key: str):
+    def __init__(self, mistral_api_key: str, config: Optional[AgentConfig] = None):
+        self.config = config or AgentConfig()
+        if self.config.newsletter_mode not in NEWSLETTER_MODES:
+            raise ValueError(f"Unknown newsletter mode {self.config.newsletter_mode!r}, expected one of {NEWSLETTER_MODES}")
+        self.news_sources = list(NEWS_SOURCES)
+        self.positive_news_sources = list(POSITIVE_NEWS_SOURCES)
+        self.metrics = RunMetrics()
+        self.session = create_session(max_per_host=self.config.http_max_per_host)
+        feed_cache_path = self.config.cache_path("feeds")
+        self.feed_fetcher = FeedFetcher(
+            timeout=self.config.feed_timeout,
+            deadline=self.config.feed_deadline,
+            max_workers=self.config.feed_workers,
+            session=self.session,
+            cache=DiskCache(feed_cache_path) if feed_cache_path else None,
+            metrics=self.metrics
+        )
+        self.text_engine = get_engine(self.config.extract_engine)
+        article_cache_path = self.config.cache_path("articles")
+        self.article_cache = DiskCache(
+            article_cache_path,
+            ttl=self.config.article_cache_ttl,
+            max_bytes=self.config.article_cache_max_bytes
+        ) if article_cache_path else None
+        seen_path = self.config.cache_path("seen")
+        self.seen_store = SeenStore(
+            seen_path,
+            retention=self.config.seen_retention_days * 24 * 3600
+        ) if seen_path else None
+        self.pending_seen_keys: List[str] = []
+        self.newsletter: Optional[NewsletterContent] = None  # Last generated newsletter, structured
+        # LangChain, LangGraph, feedparser and numpy take seconds to import, so they are
+        # imported where they are used and "main.py config" never loads them
+        from langchain_mistralai import ChatMistralAI
         self.llm = ChatMistralAI(
             model="mistral-large-latest",
             mistral_api_key=mistral_api_key,
             temperature=0.3
         )
+        score_cache_path = self.config.cache_path("scores")
+        self.score_cache = DiskCache(
+            score_cache_path,
+            ttl=self.config.score_cache_ttl,
+            max_bytes=self.config.score_cache_max_bytes
+        ) if score_cache_path else None
+        self.scorer = ScoringExecutor(
+            self.llm,
+            max_concurrency=self.config.llm_max_concurrency,
+            requests_per_second=self.config.llm_requests_per_second,
+            burst=self.config.llm_burst,
+            max_retries=self.config.llm_max_retries,
+            metrics=self.metrics
+        )
+        self.llm_calls_saved = 0  # Items the local prefilter kept away from the LLM
+        self._stats_lock = threading.Lock()  # The article and paper branches prefilter in parallel
         self.graph = self._create_graph()
         self.mcp_client = None
         self.agent = None
 
     def _scrape_news(self, state: NewsletterState) -> NewsletterState:
-        sources = [
-            "https://feeds.feedburner.com/oreilly/radar",
-            "https://techcrunch.com/feed/",
-            "https://feeds.arstechnica.com/arstechnica/index",
-            "https://www.wired.com/feed/rss",
-            "https://feeds.feedburner.com/venturebeat/SZYF",
-        ]
+        import feedparser
+
+        sources = self.news_sources
+        payloads = self.feed_fetcher.fetch_all(sources)
         
         articles = []
         
         for source_url in sources:
+            if payloads[source_url] is None:
+                continue
             try:
-                feed = feedparser.parse(source_url)
+                feed = feedparser.parse(payloads[source_url])
                 for entry in feed.entries[:5]:  # Get top 5 from each source
                     articles.append({
                         "title": entry.title,
@@ -163,67 +222,112 @@ class NewsAgent:
                         "url": entry.link,
                         "source": feed.feed.title,
                         "published": getattr(entry, 'published', ''),
-                        "content": self._extract_content(entry.link)
                     })
             except Exception as e:
                 print(f"Error scraping {source_url}: {e}")
                 traceback.print_exc()
                 continue
+
+        articles = self._drop_seen(articles, "articles")
+
+        # Fetch article bodies for all feeds at once
+        contents = self._extract_contents([article["url"] for article in articles])
+        for article, content in zip(articles, contents):
+            article["content"] = content
         
         state.raw_articles = articles
         return state
 
-    def _extract_content(self, url: str) -> str:
-        try:
-            response = requests.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+    def _item_key(self, item: Dict[str, Any]) -> str:
+        """Key identifying an item across runs: its OpenAlex ID, else its canonical URL."""
+        return item.get("id") or canonical_url(item.get("url", ""))
+
+    def _seen_keys(self, items: List[Dict[str, Any]]) -> Set[str]:
+        if self.seen_store is None or not items:
+            return set()
+        return self.seen_store.seen(self._item_key(item) for item in items)
+
+    def _drop_seen(self, items: List[Dict[str, Any]], label: str) -> List[Dict[str, Any]]:
+        """Remove items an earlier newsletter showed; items it only scored come back for another try."""
+        seen = self._seen_keys(items)
+        if not seen:
+            return items
+        fresh = [item for item in items if self._item_key(item) not in seen]
+        print(f"Skipping {len(items) - len(fresh)} {label} covered by earlier newsletters")
+        return fresh
+
+    def _extract_contents(self, urls: List[str]) -> List[str]:
+        """Extract several articles concurrently over the shared session, preserving order."""
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.config.extract_workers, len(urls))) as executor:
+            contents = list(executor.map(self._extract_content, urls))
+        if self.article_cache is not None:
+            print(f"Article cache: {self.article_cache.hits} hits, {self.article_cache.misses} misses "
+                  f"({self.article_cache.hit_rate:.0%} hit rate)")
+        return contents
 
-            # Get text content
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
+    def _extract_content(self, url: str) -> str:
+        key = canonical_url(url)
+        if self.article_cache is not None:
+            cached = self.article_cache.get(key)
+            if cached is not None:
+                return cached.decode("utf-8")
 
-            return text[:1000]  # Limit content length
+        try:
+            with self.metrics.span("article", url):
+                text = fetch_article_text(
+                    self.session,
+                    url,
+                    timeout=self.config.extract_timeout,
+                    max_chars=self.config.extract_max_chars,
+                    max_bytes=self.config.extract_max_bytes,
+                    engine=self.text_engine
+                )
         except Exception as e:
             print(f"Error extracting content from URL: {e}")
             traceback.print_exc()
             return ""
 
+        # Failed fetches return above, so only real results are cached
+        if self.article_cache is not None:
+            self.article_cache.set(key, text.encode("utf-8"))
+        return text
+
     def _scrape_positive_news(self, state: NewsletterState) -> NewsletterState:
         """Scrape positive news from curated good news RSS feeds."""
-        sources = [
-            "https://www.goodnewsnetwork.org/feed/",
-            "https://www.positive.news/feed/",
-            "https://www.goodnewsnetwork.org/category/news/world/feed/",
-            "https://www.goodnewsnetwork.org/category/news/science/feed/",
-            "https://www.euronews.com/green/rss",
-        ]
+        import feedparser
 
-        articles = []
+        sources = self.positive_news_sources
+        payloads = self.feed_fetcher.fetch_all(sources)
+
+        candidates = []  # Recent entries of each source, newest first
 
         for source_url in sources:
+            if payloads[source_url] is None:
+                continue
             try:
-                feed = feedparser.parse(source_url)
-                # Get only the TOP 1 most recent article from each source
-                if feed.entries:
-                    entry = feed.entries[0]
-                    articles.append({
-                        "title": entry.title,
-                        "summary": getattr(entry, 'summary', ''),
-                        "url": entry.link,
-                        "source": feed.feed.title,
-                        "published": getattr(entry, 'published', ''),
-                    })
+                feed = feedparser.parse(payloads[source_url])
+                candidates.append([{
+                    "title": entry.title,
+                    "summary": getattr(entry, 'summary', ''),
+                    "url": entry.link,
+                    "source": feed.feed.title,
+                    "published": getattr(entry, 'published', ''),
+                } for entry in feed.entries[:10]])
             except Exception as e:
                 print(f"Error scraping positive news from {source_url}: {e}")
                 traceback.print_exc()
                 continue
 
+        # Get only the most recent article not sent before from each source
+        seen = self._seen_keys([article for entries in candidates for article in entries])
+        articles = []
+        for entries in candidates:
+            fresh = [article for article in entries if self._item_key(article) not in seen]
+            if fresh:
+                articles.append(fresh[0])
+
         # Convert to NewsItem format with default high relevance
         # No LLM filtering needed - these are curated positive sources
         filtered_positive = []
@@ -238,308 +342,439 @@ class NewsAgent:
 
         state.raw_positive_articles = articles
         state.filtered_positive_articles = filtered_positive
+        state.new_item_keys = state.new_item_keys + [self._item_key(article) for article in articles[:5]]
         return state
 
     def _scrape_papers(self, state: NewsletterState) -> NewsletterState:
         """Scrape papers from OpenAlex API for given topics."""
-        all_papers = []
+        if self.config.paper_stream:
+            # _filter_papers pulls pages itself, and stops once it has enough relevant papers
+            return state
 
-        for topic in state.topics:
-            try:
-                # Construct OpenAlex API URL
-                openalex_url = "https://api.openalex.org/works"
-                params = {
-                    "search": topic,
-                    "per_page": 10,  # Get top 10 results per topic
-                    "sort": "cited_by_count:desc",  # Sort by most cited (relevance)
-                    "mailto": "myfeed@example.com",  # Polite pool
-                }
-
-                headers = {
-                    'User-Agent': 'MyFeed/1.0 (mailto:myfeed@example.com)'
-                }
-
-                response = requests.get(openalex_url, params=params, headers=headers, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-
-                for work in data.get("results", []):
-                    try:
-                        # Extract title
-                        title = work.get("title") or work.get("display_name", "")
-                        if not title:
-                            continue
-
-                        print(title)
-
-                        # Extract authors
-                        authorships = work.get("authorships", [])
-                        authors = ", ".join([
-                            a.get("author", {}).get("display_name", "")
-                            for a in authorships[:5]  # Limit to first 5 authors
-                            if a.get("author", {}).get("display_name")
-                        ])
-                        if len(authorships) > 5:
-                            authors += " et al."
-
-                        # Extract abstract from inverted index
-                        abstract = self._reconstruct_abstract(work.get("abstract_inverted_index"))
-
-                        # Extract URL - prefer DOI, then landing page
-                        doi = work.get("doi", "")
-                        primary_location = work.get("primary_location") or {}
-                        landing_page = primary_location.get("landing_page_url", "")
-                        url = doi if doi else landing_page
-
-                        # Extract other metadata
-                        openalex_id = work.get("id", "")
-                        publication_year = str(work.get("publication_year", ""))
-                        publication_date = work.get("publication_date", "")
-                        cited_by_count = str(work.get("cited_by_count", 0))
-
-                        # Get source/journal info
-                        source = primary_location.get("source") or {}
-                        source_name = source.get("display_name", "")
-
-                        paper = {
-                            "title": title,
-                            "url": url,
-                            "id": openalex_id,
-                            "authors": authors if authors else source_name,
-                            "summary": abstract,
-                            "year": publication_year,
-                            "publication_date": publication_date,
-                            "citations": cited_by_count,
-                            "source": source_name,
-                            "topics": topic
-                        }
-
-                        # Filter out empty values
-                        paper = {k: v for k, v in paper.items() if v}
-                        all_papers.append(paper)
-
-                    except Exception as e:
-                        print(f"Error processing paper: {e}")
-                        continue
-
-                print(f"Found {len(data.get('results', []))} papers for topic '{topic}'")
+        all_papers = [paper for papers in self._paper_pages(state.topics) for paper in papers]
+        all_papers = self._drop_seen(all_papers, "papers")
+        state.raw_papers = all_papers
+        return state
 
-            except Exception as e:
-                print(f"Error scraping papers for topic '{topic}': {e}")
-                traceback.print_exc()
+    def _paper_pages(self, topics: List[str]) -> Iterator[List[Dict[str, Any]]]:
+        """Papers for all topics, one round of pages at a time.
+
+        Each round fetches the next page of every topic that still has results,
+        concurrently. Nothing more is requested once the caller stops iterating.
+        A work found by several topics is only yielded once, listing all of them.
+        """
+        if not topics:
+            return
+        index: Dict[str, Dict[str, Any]] = {}
+        if self.config.openalex_combined_search and len(topics) > 1:
+            for papers in self._combined_pages(topics):
+                papers = self._dedupe_papers(papers, index)
+                if papers:
+                    yield papers
+            return
+
+        streams = [self._topic_pages(topic) for topic in topics]
+        with ThreadPoolExecutor(max_workers=min(self.config.openalex_workers, len(streams))) as executor:
+            while streams:
+                pages = list(executor.map(lambda stream: next(stream, None), streams))
+                streams = [stream for stream, page in zip(streams, pages) if page is not None]
+                papers = self._dedupe_papers([paper for page in pages if page for paper in page], index)
+                if papers:
+                    yield papers
+
+    def _dedupe_papers(self, papers: List[Dict[str, Any]], index: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop papers already in index (same OpenAlex ID or DOI), merging their topics into the first copy."""
+        fresh = []
+        for paper in papers:
+            keys = [key for key in (paper.get("id"), normalize_doi(paper.get("doi", ""))) if key]
+            known = next((index[key] for key in keys if key in index), None)
+            if known is None:
+                known = paper
+                fresh.append(paper)
+            else:
+                topics = known.setdefault("topics", [])
+                topics += [topic for topic in paper.get("topics", []) if topic not in topics]
+            for key in keys:
+                index.setdefault(key, known)
+        return fresh
+
+    def _topic_pages(self, topic: str) -> Iterator[List[Dict[str, Any]]]:
+        for works in self._openalex_pages(topic, self.config.paper_page_size, self.config.paper_budget):
+            yield [paper for paper in (self._parse_work(work, [topic]) for work in works) if paper]
+
+    def _combined_pages(self, topics: List[str]) -> Iterator[List[Dict[str, Any]]]:
+        """A single OR-search for all topics; each paper is attributed to the topic it matches best."""
+        from .prefilter import bm25_scores
+
+        query = " OR ".join(f"({topic})" for topic in topics)
+        pages = self._openalex_pages(
+            query,
+            self.config.paper_page_size * len(topics),
+            self.config.paper_budget * len(topics)
+        )
+        for works in pages:
+            papers = [paper for paper in (self._parse_work(work, []) for work in works) if paper]
+            if not papers:
                 continue
+            scores = bm25_scores([f"{paper['title']} {paper.get('summary', '')}" for paper in papers], topics)
+            for paper, column in zip(papers, scores.T):
+                # OpenAlex also matches on fields we don't see; those papers keep every topic
+                paper["topics"] = [topics[column.argmax()]] if column.max() > 0 else list(topics)
+            yield papers
+
+    def _openalex_pages(self, query: str, page_size: int, budget: int) -> Iterator[List[Dict[str, Any]]]:
+        """Pages of OpenAlex works matching query; a failed request ends the search."""
+        found = 0
+        try:
+            for works in iter_pages(
+                self.session,
+                search_params(query, self._paper_window_start()),
+                page_size=page_size,
+                budget=budget,
+                timeout=self.config.openalex_timeout,
+                metrics=self.metrics
+            ):
+                found += len(works)
+                yield works
+        except Exception as e:
+            print(f"Error scraping papers for topic '{query}': {e}")
+            traceback.print_exc()
+        print(f"Found {found} papers for topic '{query}'")
 
-        state.raw_papers = all_papers
-        return state
+    def _paper_window_start(self) -> date:
+        """Earliest publication date of papers eligible for the newsletter."""
+        return date.today() - timedelta(days=self.config.paper_window_days)
+
+    def _parse_work(self, work: Dict[str, Any], topics: List[str]) -> Optional[Dict[str, Any]]:
+        """Convert an OpenAlex work to a paper dict, or None if it has no title or is malformed."""
+        try:
+            # Extract title
+            title = work.get("title") or work.get("display_name", "")
+            if not title:
+                return None
+
+            print(title)
+
+            # Extract authors
+            authorships = work.get("authorships", [])
+            authors = ", ".join([
+                a.get("author", {}).get("display_name", "")
+                for a in authorships[:5]  # Limit to first 5 authors
+                if a.get("author", {}).get("display_name")
+            ])
+            if len(authorships) > 5:
+                authors += " et al."
+
+            # Extract abstract from inverted index
+            abstract = self._reconstruct_abstract(work.get("abstract_inverted_index"))
+
+            # Extract URL - prefer DOI, then landing page
+            doi = work.get("doi", "")
+            primary_location = work.get("primary_location") or {}
+            landing_page = primary_location.get("landing_page_url", "")
+            url = doi if doi else landing_page
+
+            # Extract other metadata
+            openalex_id = work.get("id", "")
+            publication_year = str(work.get("publication_year", ""))
+            publication_date = work.get("publication_date", "")
+            cited_by_count = str(work.get("cited_by_count", 0))
+
+            # Get source/journal info
+            source = primary_location.get("source") or {}
+            source_name = source.get("display_name", "")
+
+            paper = {
+                "title": title,
+                "url": url,
+                "id": openalex_id,
+                "doi": doi,
+                "authors": authors if authors else source_name,
+                "summary": abstract,
+                "year": publication_year,
+                "publication_date": publication_date,
+                "citations": cited_by_count,
+                "source": source_name,
+                "topics": topics
+            }
+
+            # Filter out empty values
+            return {k: v for k, v in paper.items() if v}
+
+        except Exception as e:
+            print(f"Error processing paper: {e}")
+            return None
 
     def _reconstruct_abstract(self, inverted_index: dict) -> str:
         """Reconstruct abstract text from OpenAlex inverted index format."""
-        if not inverted_index:
-            return ""
+        return reconstruct_abstract(inverted_index, max_chars=1000)
+
+    def _score_items(self, kind: str, topics: List[str], items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Ask the LLM to rate each item; returns the parsed JSON result per item, None on failure."""
+        topics = ", ".join(topics)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        keys = [self._score_cache_key(kind, topics, fields) for fields in items]
+        if self.score_cache is not None:
+            for i, key in enumerate(keys):
+                cached = self.score_cache.get(key)
+                if cached is not None:
+                    results[i] = json.loads(cached)
+            print(f"LLM score cache: {self.score_cache.hits} hits, {self.score_cache.misses} misses "
+                  f"({self.score_cache.hit_rate:.0%} hit rate)")
+
+        uncached = [i for i, result in enumerate(results) if result is None]
+        pending = uncached
+        if self.config.score_batch_size > 1 and len(pending) > 1:
+            pending = self._score_batches(kind, topics, items, pending, results)
+
+        from langchain_core.prompts import ChatPromptTemplate
+        prompt = ChatPromptTemplate.from_template(FILTER_PROMPTS[kind]["single"])
+        responses = self.scorer.map([prompt.format(topics=topics, **items[i]) for i in pending])
+        for i, response in zip(pending, responses):
+            results[i] = self._parse_score_response(kind, items[i], response)
+
+        if self.score_cache is not None:
+            for i in uncached:
+                result = results[i]
+                if self._is_score(result):
+                    self.score_cache.set(keys[i], json.dumps(result).encode("utf-8"))
+        return results
+
+    @staticmethod
+    def _is_score(result: Optional[Dict[str, Any]]) -> bool:
+        """Whether the LLM actually rated the item, as opposed to failing or answering garbage."""
+        return isinstance(result, dict) and "relevance_score" in result and "summary" in result
+
+    def _score_cache_key(self, kind: str, topics: str, fields: Dict[str, Any]) -> str:
+        """Hash of everything that determines the LLM's rating of an item."""
+        prompts = FILTER_PROMPTS[kind]
+        payload = json.dumps([
+            getattr(self.llm, "model", None),
+            getattr(self.llm, "temperature", None),
+            prompts["single"],
+            prompts["batch"],
+            topics,
+            fields,
+        ], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _score_batches(self, kind: str, topics: str, items: List[Dict[str, Any]], indices: List[int],
+                       results: List[Optional[Dict[str, Any]]]) -> List[int]:
+        """Score the given items K at a time, filling results in place.
+
+        Returns the indices of items that still need a per-item prompt, either
+        because they don't share a batch or because their batch entry was unusable.
+        """
+        prompts = FILTER_PROMPTS[kind]
+        costs = [estimate_tokens(prompts["item"].format(id=0, **items[i])) + SUMMARY_TOKENS for i in indices]
+        batches = [[indices[position] for position in batch] for batch in plan_batches(
+            costs,
+            max_items=self.config.score_batch_size,
+            max_tokens=self.config.score_batch_max_tokens,
+            overhead=estimate_tokens(prompts["batch"]) + estimate_tokens(topics)
+        )]
+
+        leftovers = [batch[0] for batch in batches if len(batch) == 1]
+        batches = [batch for batch in batches if len(batch) > 1]
+
+        from langchain_core.prompts import ChatPromptTemplate
+        prompt = ChatPromptTemplate.from_template(prompts["batch"])
+        responses = self.scorer.map([prompt.format(
+            topics=topics,
+            items="\n\n        ".join(prompts["item"].format(id=n, **items[i]) for n, i in enumerate(batch, 1))
+        ) for batch in batches])
+
+        for batch, response in zip(batches, responses):
+            parsed = {}
+            if response is not None and response.content:
+                parsed = parse_batch_results(self._parse_json_response(response.content), len(batch))
+            for n, i in enumerate(batch, 1):
+                if n in parsed:
+                    results[i] = parsed[n]
+                    print(f"LLM score for {kind} '{items[i]['title'][:50]}...': {parsed[n]['relevance_score']}")
+                else:
+                    leftovers.append(i)
+
+        print(f"Scored {len(indices) - len(leftovers)}/{len(indices)} {kind}s in {len(batches)} batch requests, "
+              f"{len(leftovers)} left for per-item prompts")
+        return sorted(leftovers)
+
+    def _prefilter(self, kind: str, topics: List[str], items: List[Dict[str, Any]],
+                   fields: List[str]) -> List[Dict[str, Any]]:
+        """Keep only items that a local BM25 ranking against the topics considers plausible."""
+        top_k, min_score = self.config.prefilter_top_k, self.config.prefilter_min_score
+        if (top_k <= 0 and min_score <= 0) or not items or not topics:
+            return items
+
+        from .prefilter import bm25_scores, select_candidates
+
+        documents = [" ".join(str(item.get(field, "")) for field in fields) for item in items]
+        kept = select_candidates(bm25_scores(documents, topics), top_k, min_score)
+        with self._stats_lock:
+            self.llm_calls_saved += len(items) - len(kept)
+        print(f"Prefilter kept {len(kept)}/{len(items)} {kind}s, saving {len(items) - len(kept)} LLM calls")
+        return [items[i] for i in kept]
+
+    def _parse_score_response(self, kind: str, fields: Dict[str, Any], response: Any) -> Optional[Dict[str, Any]]:
+        if response is None:
+            return None
+        print(f"LLM Response for {kind} '{fields['title'][:50]}...': {response.content}")
+        if not response.content or not response.content.strip():
+            print(f"Warning: Empty response from LLM for {kind}: {fields['title']}")
+            return None
+        return self._parse_json_response(response.content)
+
+    def _parse_json_response(self, raw: str) -> Optional[Any]:
+        # Try to extract JSON from the response if it's wrapped in markdown or other text
+        content = raw.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
 
         try:
-            # Build list of (position, word) tuples
-            word_positions = []
-            for word, positions in inverted_index.items():
-                for pos in positions:
-                    word_positions.append((pos, word))
-
-            # Sort by position and join
-            word_positions.sort(key=lambda x: x[0])
-            abstract = " ".join([word for _, word in word_positions])
-
-            # Limit length
-            return abstract[:1000] if len(abstract) > 1000 else abstract
-        except Exception:
-            return ""
+            return json.loads(content)
+        except json.JSONDecodeError:
+            print(f"Failed to parse JSON. Raw content: {repr(raw)}")
+            return None
 
     def _filter_articles(self, state: NewsletterState) -> NewsletterState:
-        filter_prompt = ChatPromptTemplate.from_template("""
-        You are a newsletter curator. Given these topics of interest: {topics}
-        
-        Rate the relevance of this article on a scale of 0-10 and provide a concise summary.
-        
-        Article Title: {title}
-        Article Summary: {summary}
-        Article Content: {content}
-        
-        Respond in JSON format:
-        {{
-            "relevance_score": <score>,
-            "summary": "<your_summary>",
-            "reasoning": "<brief_reasoning>"
-        }}
-        """)
-        
         filtered_articles = []
+
+        articles = self._prefilter("article", state.topics, state.raw_articles, ["title", "summary", "content"])
+        results = self._score_items("article", state.topics, [{
+            "title": article["title"],
+            "summary": article["summary"],
+            "content": article["content"]
+        } for article in articles])
         
-        for article in state.raw_articles:
+        for article, result in zip(articles, results):
+            if result is None:
+                continue
             try:
-                response = self.llm.invoke(filter_prompt.format(
-                    topics=", ".join(state.topics),
-                    title=article["title"],
-                    summary=article["summary"],
-                    content=article["content"]
-                ))
-                
-                print(f"LLM Response for article '{article['title'][:50]}...': {response.content}")
-                
-                if not response.content or not response.content.strip():
-                    print(f"Warning: Empty response from LLM for article: {article['title']}")
-                    continue
-                
-                # Try to extract JSON from the response if it's wrapped in markdown or other text
-                content = response.content.strip()
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.endswith("```"):
-                    content = content[:-3]
-                content = content.strip()
-                
-                try:
-                    result = json.loads(content)
-                except json.JSONDecodeError:
-                    print(f"Failed to parse JSON. Raw content: {repr(response.content)}")
-                    continue
-                
                 if result["relevance_score"] >= 6:  # Only include relevant articles
-                    filtered_articles.append(NewsItem(
+                    filtered_articles.append((self._item_key(article), NewsItem(
                         title=article["title"],
                         summary=result["summary"],
                         url=article["url"],
                         source=article["source"],
                         relevance_score=result["relevance_score"]
-                    ))
+                    )))
             except Exception as e:
                 print(f"Error filtering article: {e}")
                 traceback.print_exc()
                 continue
         
         # Sort by relevance score
-        filtered_articles.sort(key=lambda x: x.relevance_score, reverse=True)
-        state.filtered_articles = filtered_articles[:6]  # Top 5-6 articles
+        filtered_articles.sort(key=lambda x: x[1].relevance_score, reverse=True)
+        filtered_articles = filtered_articles[:6]  # Top 5-6 articles
+        state.filtered_articles = [item for _, item in filtered_articles]
+        # Only what the newsletter shows counts as covered; the rest may make the cut another day
+        state.new_item_keys = state.new_item_keys + [key for key, _ in filtered_articles]
 
         return state
 
     def _filter_papers(self, state: NewsletterState) -> NewsletterState:
-        from datetime import datetime, timedelta
-
-        filter_prompt = ChatPromptTemplate.from_template("""
-        You are an academic newsletter curator. Given these topics of interest: {topics}
-
-        Rate the relevance of this research paper on a scale of 0-10 and provide a concise academic summary.
-
-        Paper Title: {title}
-        Authors: {authors}
-        Abstract/Summary: {summary}
-        Citations: {citations}
-
-        Respond in JSON format:
-        {{
-            "relevance_score": <score>,
-            "summary": "<academic_summary>",
-            "reasoning": "<brief_reasoning>"
-        }}
-        """)
-
         # Calculate date ranges
         today = datetime.now().date()
-        two_weeks_ago = today - timedelta(days=14)
+        two_weeks_ago = self._paper_window_start()
 
         today_papers = []
         recent_papers = []
-        all_filtered_papers = []
 
-        for paper in state.raw_papers:
-            try:
-                # Use .get() for safer access to optional fields
-                title = paper.get("title", "")
-                authors = paper.get("authors", "Unknown")
-                summary = paper.get("summary", "")
-                citations = paper.get("citations", "0")
-                url = paper.get("url", "")
-                year = paper.get("year", "")
-                publication_date = paper.get("publication_date", "")
-
-                if not title:
-                    continue
-
-                response = self.llm.invoke(filter_prompt.format(
-                    topics=", ".join(state.topics),
-                    title=title,
-                    authors=authors,
-                    summary=summary,
-                    citations=citations
-                ))
-
-                print(f"LLM Response for paper '{title[:50]}...': {response.content}")
-
-                if not response.content or not response.content.strip():
-                    print(f"Warning: Empty response from LLM for paper: {title}")
-                    continue
-
-                # Try to extract JSON from the response if it's wrapped in markdown or other text
-                content = response.content.strip()
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.endswith("```"):
-                    content = content[:-3]
-                content = content.strip()
+        if self.config.paper_stream:
+            all_filtered_papers = self._stream_relevant_papers(state)
+        else:
+            all_filtered_papers = self._relevant_papers(state.topics, state.raw_papers)
 
+        for key, paper_item in all_filtered_papers:
+            # Categorize by date
+            if paper_item.publication_date:
                 try:
-                    result = json.loads(content)
-                except json.JSONDecodeError:
-                    print(f"Failed to parse JSON. Raw content: {repr(response.content)}")
-                    continue
-
-                if result["relevance_score"] >= 6:  # Only include relevant papers
-                    paper_item = PaperItem(
-                        title=title,
-                        authors=authors,
-                        summary=result["summary"],
-                        url=url,
-                        year=year,
-                        citations=citations,
-                        relevance_score=result["relevance_score"],
-                        publication_date=publication_date
-                    )
-
-                    # Categorize by date
-                    if publication_date:
-                        try:
-                            pub_date = datetime.strptime(publication_date, "%Y-%m-%d").date()
-                            if pub_date == today:
-                                today_papers.append(paper_item)
-                            elif pub_date >= two_weeks_ago:
-                                recent_papers.append(paper_item)
-                        except ValueError:
-                            # If date parsing fails, add to recent papers
-                            recent_papers.append(paper_item)
-                    else:
-                        # If no date, add to recent papers
-                        recent_papers.append(paper_item)
-
-                    all_filtered_papers.append(paper_item)
-            except Exception as e:
-                print(f"Error filtering paper: {e}")
-                traceback.print_exc()
-                continue
+                    pub_date = datetime.strptime(paper_item.publication_date, "%Y-%m-%d").date()
+                    if pub_date == today:
+                        today_papers.append((key, paper_item))
+                    elif pub_date >= two_weeks_ago:
+                        recent_papers.append((key, paper_item))
+                except ValueError:
+                    # If date parsing fails, add to recent papers
+                    recent_papers.append((key, paper_item))
+            else:
+                # If no date, add to recent papers
+                recent_papers.append((key, paper_item))
 
         # Sort by relevance score
-        today_papers.sort(key=lambda x: x.relevance_score, reverse=True)
-        recent_papers.sort(key=lambda x: x.relevance_score, reverse=True)
+        today_papers.sort(key=lambda x: x[1].relevance_score, reverse=True)
+        recent_papers.sort(key=lambda x: x[1].relevance_score, reverse=True)
 
         # Keep top 1-3 papers for each category
-        state.today_papers = today_papers[:3]
-        state.recent_papers = recent_papers[:3]
+        state.today_papers = [item for _, item in today_papers[:3]]
+        state.recent_papers = [item for _, item in recent_papers[:3]]
+        # Only the papers the newsletter shows count as covered
+        state.new_item_keys = state.new_item_keys + [key for key, _ in today_papers[:3] + recent_papers[:3]]
 
         # Keep all filtered papers for backwards compatibility
-        all_filtered_papers.sort(key=lambda x: x.relevance_score, reverse=True)
-        state.filtered_papers = all_filtered_papers[:5]
+        all_filtered_papers.sort(key=lambda x: x[1].relevance_score, reverse=True)
+        state.filtered_papers = [item for _, item in all_filtered_papers[:5]]
 
         return state
 
+    def _relevant_papers(self, topics: List[str], raw_papers: List[Dict[str, Any]]) -> List[Tuple[str, PaperItem]]:
+        """Score papers with the LLM and keep the relevant ones, each with its seen-store key."""
+        # Use .get() for safer access to optional fields
+        papers = [paper for paper in raw_papers if paper.get("title")]
+        papers = self._prefilter("paper", topics, papers, ["title", "summary"])
+        results = self._score_items("paper", topics, [{
+            "title": paper["title"],
+            "authors": paper.get("authors", "Unknown"),
+            "summary": paper.get("summary", ""),
+            "citations": paper.get("citations", "0")
+        } for paper in papers])
+
+        relevant = []
+        for paper, result in zip(papers, results):
+            if result is None:
+                continue
+            try:
+                if result["relevance_score"] >= 6:  # Only include relevant papers
+                    relevant.append((self._item_key(paper), PaperItem(
+                        title=paper["title"],
+                        authors=paper.get("authors", "Unknown"),
+                        summary=result["summary"],
+                        url=paper.get("url", ""),
+                        year=paper.get("year", ""),
+                        citations=paper.get("citations", "0"),
+                        relevance_score=result["relevance_score"],
+                        publication_date=paper.get("publication_date", "")
+                    )))
+            except Exception as e:
+                print(f"Error filtering paper: {e}")
+                traceback.print_exc()
+                continue
+        return relevant
+
+    def _stream_relevant_papers(self, state: NewsletterState) -> List[Tuple[str, PaperItem]]:
+        """Fetch and score papers round by round until paper_stream_target of them are relevant."""
+        relevant = []
+        for papers in self._paper_pages(state.topics):
+            papers = self._drop_seen(papers, "papers")
+            state.raw_papers = state.raw_papers + papers
+            relevant += self._relevant_papers(state.topics, papers)
+            if len(relevant) >= self.config.paper_stream_target:
+                print(f"Found {len(relevant)} relevant papers after {len(state.raw_papers)}, "
+                      "not fetching further pages")
+                break
+        return relevant
+
     def _generate_newsletter(self, state: NewsletterState) -> NewsletterState:
+        if self.config.newsletter_mode == "direct":
+            state.newsletter = self._build_newsletter(state)
+            state.newsletter_content = state.newsletter.format()
+            return state
+
+        from langchain_core.prompts import ChatPromptTemplate
         newsletter_prompt = ChatPromptTemplate.from_template("""
         Create a structured newsletter for these topics: {topics}
 
@@ -615,45 +850,126 @@ class NewsAgent:
         # Use structured output with the NewsletterContent schema
         structured_llm = self.llm.with_structured_output(NewsletterContent)
 
-        response = structured_llm.invoke(newsletter_prompt.format(
+        prompt = newsletter_prompt.format(
             topics=", ".join(state.topics),
             date=datetime.now().strftime("%B %d, %Y"),
             positive_articles_data=positive_articles_data,
             articles_data=articles_data,
             today_papers_data=today_papers_data,
             recent_papers_data=recent_papers_data
-        ))
+        )
+        with self.metrics.span("llm", "generate_newsletter") as span:
+            response = structured_llm.invoke(prompt)
+            # Structured output hides the API's usage metadata, so estimate
+            span.tokens_in = estimate_tokens(prompt)
+            span.tokens_out = estimate_tokens(response.model_dump_json())
 
         # Use the format method to generate the final newsletter content
+        state.newsletter = response
         state.newsletter_content = response.format()
         return state
 
-    def _create_graph(self) -> StateGraph:
+    def _build_newsletter(self, state: NewsletterState) -> NewsletterContent:
+        """Assemble the newsletter straight from the filtered items, without rewriting them."""
+        return NewsletterContent(
+            introduction=self._introduction(state) if self.config.newsletter_llm_intro else INTRODUCTION,
+            positive_news=[StructuredArticle(**article.model_dump()) for article in state.filtered_positive_articles],
+            latest_news=[StructuredArticle(**article.model_dump()) for article in state.filtered_articles],
+            todays_papers=[StructuredPaper(**paper.model_dump()) for paper in state.today_papers],
+            recent_papers=[StructuredPaper(**paper.model_dump()) for paper in state.recent_papers],
+            closing_note=CLOSING_NOTE
+        )
+
+    def _introduction(self, state: NewsletterState) -> str:
+        """Short LLM-written introduction from the headlines only, falling back to the fixed one."""
+        headlines = [item.title for item in state.filtered_positive_articles + state.filtered_articles]
+        headlines += [paper.title for paper in state.today_papers + state.recent_papers]
+        if not headlines:
+            return INTRODUCTION
+        prompt = INTRO_TEMPLATE.format(
+            topics=", ".join(state.topics),
+            date=datetime.now().strftime("%B %d, %Y"),
+            headlines="\n".join(f"- {title}" for title in headlines)
+        )
+        try:
+            introduction = self.scorer.invoke(prompt).content.strip()
+        except Exception as e:
+            print(f"Error writing introduction: {e}")
+            traceback.print_exc()
+            return INTRODUCTION
+        return introduction or INTRODUCTION
+
+    def _branch(self, steps, *keys: str):
+        """Wrap node methods as one graph node that runs them in order and only writes the keys its branch owns.
+
+        Parallel branches may not write the same key in one step, so each returns its own
+        keys plus the seen-store keys it added, which the reducer concatenates. Each step
+        is still timed on its own.
+        """
+        def node(state: NewsletterState) -> Dict[str, Any]:
+            state = state.model_copy()
+            known = len(state.new_item_keys)
+            for step in steps:
+                with self.metrics.span("node", step.__name__.lstrip("_")):
+                    state = step(state)
+            update = {key: getattr(state, key) for key in keys}
+            update["new_item_keys"] = state.new_item_keys[known:]
+            return update
+        return node
+
+    def _create_graph(self):
+        from langgraph.graph import StateGraph, START, END
+
         workflow = StateGraph(NewsletterState)
 
-        workflow.add_node("scrape_positive_news", self._scrape_positive_news)
-        workflow.add_node("scrape_news", self._scrape_news)
-        workflow.add_node("scrape_papers", self._scrape_papers)
-        workflow.add_node("filter_articles", self._filter_articles)
-        workflow.add_node("filter_papers", self._filter_papers)
-        workflow.add_node("generate_newsletter", self._generate_newsletter)
-
-        workflow.set_entry_point("scrape_positive_news")
-        workflow.add_edge("scrape_positive_news", "scrape_news")
-        workflow.add_edge("scrape_news", "scrape_papers")
-        workflow.add_edge("scrape_papers", "filter_articles")
-        workflow.add_edge("filter_articles", "filter_papers")
-        workflow.add_edge("filter_papers", "generate_newsletter")
+        # LangGraph runs nodes in lockstep supersteps, so each source is scraped and filtered
+        # within a single node: filtering news then never waits for the paper scrape, and
+        # the run takes as long as the slowest branch
+        workflow.add_node("positive_news", self._branch(
+            [self._scrape_positive_news], "raw_positive_articles", "filtered_positive_articles"))
+        workflow.add_node("news", self._branch(
+            [self._scrape_news, self._filter_articles], "raw_articles", "filtered_articles"))
+        workflow.add_node("papers", self._branch(
+            [self._scrape_papers, self._filter_papers],
+            "raw_papers", "filtered_papers", "today_papers", "recent_papers"))
+        workflow.add_node("generate_newsletter", self._branch(
+            [self._generate_newsletter], "newsletter_content", "newsletter"))
+
+        workflow.add_edge(START, "positive_news")
+        workflow.add_edge(START, "news")
+        workflow.add_edge(START, "papers")
+        workflow.add_edge(["positive_news", "news", "papers"], "generate_newsletter")
         workflow.add_edge("generate_newsletter", END)
-        
+
         return workflow.compile()
 
     def generate_newsletter(self, topics: List[str]) -> str:
+        self.metrics.reset()
         initial_state = NewsletterState(topics=topics)
         result = self.graph.invoke(initial_state)
         
         # Handle both dict and NewsletterState return types
         if isinstance(result, dict):
-            return result.get("newsletter_content", "")
-        else:
-            return result.newsletter_content
+            result = NewsletterState(**result)
+
+        # Committed by mark_seen() once the newsletter has actually been delivered
+        self.pending_seen_keys = result.new_item_keys
+        self.newsletter = result.newsletter
+        return result.newsletter_content
+
+    def write_metrics(self) -> None:
+        """Write the run report to the configured JSON and Prometheus textfile paths, if any."""
+        try:
+            if self.config.metrics_json:
+                self.metrics.write_json(self.config.metrics_json)
+            if self.config.metrics_textfile:
+                self.metrics.write_prometheus(self.config.metrics_textfile)
+        except Exception as e:
+            print(f"Error writing run metrics: {e}")
+            traceback.print_exc()
+
+    def mark_seen(self) -> None:
+        """Remember the items shown in the last newsletter so later runs skip them."""
+        if self.seen_store is not None and self.pending_seen_keys:
+            self.seen_store.add(self.pending_seen_keys)
+        self.pending_seen_keys = []
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional, Set
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    "key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL, "
+    "accessed REAL NOT NULL, size INTEGER NOT NULL)"
+)
+
+
+class SQLiteStore:
+    """Base of the SQLite-backed stores: one connection, shared between threads behind a lock."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL lets several processes (e.g. one per profile) read while another writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class DiskCache(SQLiteStore):
+    """Small persistent key/value store backed by SQLite, safe to share between threads.
+
+    Entries older than ttl seconds are treated as missing. When max_bytes or
+    max_entries is set, the least recently used entries are evicted on write.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn.execute(SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and row[1] < now - self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, len(value))
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN "
+                "(SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        if self.max_bytes is not None:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            stale = []
+            for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+                if total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def purge_expired(self) -> int:
+        """Delete entries past their TTL and return how many were removed."""
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+            return cursor.rowcount
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class SeenStore(SQLiteStore):
+    """Persistent set of item keys (canonical URLs, OpenAlex IDs) already covered by a newsletter.
+
+    Only items a newsletter actually showed are added: relevant items that missed the cut
+    and low-scoring ones stay eligible, and the score cache keeps rating them again cheap.
+    Keys older than retention seconds are forgotten, so the index stays small.
+    """
+
+    QUERY_CHUNK = 500  # Stay well below SQLite's bound-parameter limit
+
+    def __init__(self, path: str, retention: Optional[float] = None):
+        super().__init__(path)
+        self.retention = retention
+        self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY, first_seen REAL NOT NULL)")
+
+    def seen(self, keys: Iterable[str]) -> Set[str]:
+        """Return the subset of keys that are already in the index."""
+        keys = list(set(keys))
+        found = set()
+        with self._lock:
+            for start in range(0, len(keys), self.QUERY_CHUNK):
+                chunk = keys[start:start + self.QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(f"SELECT key FROM seen WHERE key IN ({placeholders})", chunk)
+                found.update(row[0] for row in rows)
+        return found
+
+    def add(self, keys: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO seen (key, first_seen) VALUES (?, ?)",
+                [(key, now) for key in set(keys)]
+            )
+            if self.retention is not None:
+                self._conn.execute("DELETE FROM seen WHERE first_seen < ?", (now - self.retention,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
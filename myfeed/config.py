@@ -0,0 +1,76 @@
+import os
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class AgentConfig(BaseSettings):
+    """Tunables for NewsAgent. Every field can be overridden with a MYFEED_<FIELD> env var."""
+    model_config = SettingsConfigDict(env_prefix="MYFEED_")
+
+    # Persistent caches live here; None disables them
+    cache_dir: Optional[str] = None
+
+    # Feed fetching
+    feed_timeout: float = 10.0  # Seconds allowed per feed
+    feed_deadline: float = 30.0  # Seconds allowed for all feeds together
+    feed_workers: int = 16
+
+    # Shared HTTP session
+    http_max_per_host: int = 4  # Concurrent connections allowed to a single host
+
+    # Article body extraction
+    extract_timeout: float = 10.0
+    extract_workers: int = 16
+    extract_max_chars: int = 1000  # Visible text kept per article
+    extract_max_bytes: int = 512 * 1024  # Stop downloading an article past this size
+    extract_engine: str = "auto"  # selectolax, lxml, bs4, stdlib, or auto for selectolax/lxml if installed, else stdlib
+    article_cache_ttl: float = 7 * 24 * 3600  # Seconds before extracted text is fetched again
+    article_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # OpenAlex paper search
+    openalex_timeout: float = 30.0
+    openalex_workers: int = 4  # Topics searched concurrently
+    openalex_combined_search: bool = False  # One OR-search for all topics, papers attributed to topics locally
+    paper_window_days: int = 14  # Papers published longer ago are neither requested nor shown
+    paper_page_size: int = 10  # Works per OpenAlex page (at most 200)
+    paper_budget: int = 10  # Works fetched per topic at most, across pages
+    paper_stream: bool = False  # Score papers page by page, stopping once paper_stream_target are relevant
+    paper_stream_target: int = 6
+
+    # Items already covered by a sent newsletter are skipped (needs cache_dir)
+    seen_retention_days: float = 90
+
+    # LLM relevance scoring; the rate defaults to Mistral's free-tier quota of 1 request/s
+    llm_max_concurrency: int = 4
+    llm_requests_per_second: float = 1.0
+    llm_burst: float = 1.0
+    llm_max_retries: int = 4  # Retries on 429 and 5xx responses
+    score_batch_size: int = 1  # Items rated per LLM request; 1 keeps one prompt per item
+    score_batch_max_tokens: int = 8000  # Estimated prompt + response tokens per batch request
+    score_cache_ttl: float = 30 * 24 * 3600  # Seconds an LLM rating is reused for the same item and topics
+    score_cache_max_bytes: int = 32 * 1024 * 1024
+
+    # Local BM25 prefilter ahead of the LLM; disabled while both are 0
+    prefilter_top_k: int = 0  # Keep each topic's K best-matching items
+    prefilter_min_score: float = 0.0  # Also keep any item scoring at least this for a topic
+
+    # Newsletter assembly: "llm" has the model rewrite the sections, "direct" copies the filtered items
+    newsletter_mode: str = "llm"
+    newsletter_llm_intro: bool = False  # In direct mode, ask the LLM for a short introduction
+
+    # Outbound mail spool (needs cache_dir): finished messages are stored, then delivered with retries
+    mail_workers: int = 2  # SMTP connections used at once to drain the spool
+    mail_max_attempts: int = 6  # A message is given up on after this many failed attempts
+    mail_retry_base: float = 30.0  # Seconds before the first retry, doubling with every attempt
+    mail_drain_timeout: float = 120.0  # Seconds to keep retrying before leaving messages for the next run
+
+    # Run instrumentation: per-node and per-call timings, bytes, tokens and peak memory
+    metrics_json: Optional[str] = None  # Write the run report as JSON to this path
+    metrics_textfile: Optional[str] = None  # Write it in Prometheus text format (node_exporter textfile collector)
+
+    def cache_path(self, name: str) -> Optional[str]:
+        """Path of the named cache database, or None when caching is disabled."""
+        if not self.cache_dir:
+            return None
+        return os.path.join(os.path.expanduser(self.cache_dir), f"{name}.sqlite")
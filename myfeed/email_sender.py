@@ -1,229 +1,244 @@
+import re
 import smtplib
 import traceback
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Template
 from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+from .models import NewsletterContent
+from .spool import MailSpool
+
+# The Markdown subset emitted by NewsletterContent.format
+HEADING_PATTERN = re.compile(r"(#{1,3}) (.*)")
+RULE_PATTERN = re.compile(r"-{3,}[ \t]*")
+INLINE_PATTERN = re.compile(r"\*\*(?P<bold>.*?)\*\*|\[(?P<text>[^\]]+)\]\((?P<url>[^)]+)\)")
+
+
+def _render_inline(match: re.Match) -> str:
+    if match.group("bold") is not None:
+        return f"<strong>{match.group('bold')}</strong>"
+    return f'<a href="{match.group("url")}">{match.group("text")}</a>'
+
+
+def render_markdown(content: str) -> str:
+    """Render newsletter Markdown (headings, rules, bold, links) to HTML in a single pass over its lines.
+
+    Blank lines separate paragraphs and single newlines become line breaks.
+    """
+    paragraphs = []
+    lines = []
+    for line in content.strip("\n").split("\n"):
+        if not line:
+            if lines:
+                paragraphs.append("<br>".join(lines))
+                lines = []
+            continue
+        if "**" in line or "](" in line:
+            line = INLINE_PATTERN.sub(_render_inline, line)
+        if line[0] == "#":
+            heading = HEADING_PATTERN.fullmatch(line)
+            if heading:
+                level = len(heading.group(1))
+                line = f"<h{level}>{heading.group(2)}</h{level}>"
+        elif line[0] == "-" and RULE_PATTERN.fullmatch(line):
+            line = "<hr>"
+        lines.append(line)
+    if lines:
+        paragraphs.append("<br>".join(lines))
+    return "<p>" + "</p><p>".join(paragraphs) + "</p>"
+
+
+def _connection_lost(error: Exception) -> bool:
+    """Whether error means the server is gone: a disconnect, a socket error or a 421 reply."""
+    if isinstance(error, smtplib.SMTPResponseException):
+        # 421: the server is closing the connection (idle timeout, per-connection message cap)
+        return error.smtp_code == 421
+    return isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError))
+
 
 class EmailSender:
-    def __init__(self, smtp_server: str, smtp_port: int, email_address: str, email_password: str, to_email: str):
+    """Sends the newsletter over one authenticated SMTP connection, reused across recipients."""
+
+    def __init__(self, smtp_server: str, smtp_port: int, email_address: str, email_password: str, to_email: str,
+                 use_tls: bool = True, timeout: float = 30.0):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.email_address = email_address
         self.email_password = email_password
-        self.to_email = to_email
+        self.to_email = to_email  # One address, or several separated by commas
+        self.use_tls = use_tls  # STARTTLS before logging in; only local relays should turn it off
+        self.timeout = timeout
+        self._server: Optional[smtplib.SMTP] = None
+
+    @property
+    def recipients(self) -> List[str]:
+        return [address.strip() for address in self.to_email.split(",") if address.strip()]
+
+    def send_newsletter(self, content: Union[str, NewsletterContent], subject: str = None) -> bool:
+        """Send the newsletter to every recipient; True only if all of them got it."""
+        results = self.send_batch(content, self.recipients, subject)
+        return bool(results) and all(results.values())
+
+    def send_batch(self, content: Union[str, NewsletterContent], recipients: List[str],
+                   subject: str = None) -> Dict[str, bool]:
+        """Send one copy of the newsletter per recipient over a single connection.
+
+        The message is rendered once. A dropped connection is reopened and the send retried
+        once; other failures, including failing to reconnect, only affect their recipient.
+        Returns whether each recipient got it.
+        """
+        results = {}
+        try:
+            msg = self._build_message(content, subject)
+        except Exception as e:
+            print(f"Failed to build newsletter: {e}")
+            traceback.print_exc()
+            return {recipient: False for recipient in recipients}
 
-    def send_newsletter(self, content: str, subject: str = None) -> bool:
         try:
-            if not subject:
-                subject = f"Your Daily Newsletter 😎💨🥴🤖🌍🇫🇷🇺🇸 - {datetime.now().strftime('%B %d, %Y')}"
-            
-            # Create HTML version of the newsletter
+            # A connection left open by test_email_connection may have timed out since
+            if self._server is not None:
+                try:
+                    code, message = self._server.noop()
+                    if code != 250:
+                        self._reconnect(smtplib.SMTPResponseException(code, message))
+                except (smtplib.SMTPException, OSError) as e:
+                    self._reconnect(e)
+            for recipient in recipients:
+                del msg['To']
+                msg['To'] = recipient
+                try:
+                    self.deliver(msg, recipient)
+                    results[recipient] = True
+                    print(f"Newsletter sent successfully to {recipient}")
+                except Exception as e:
+                    results[recipient] = False
+                    print(f"Failed to send newsletter to {recipient}: {e}")
+                    traceback.print_exc()
+        finally:
+            self.close()
+        return results
+
+    def _build_message(self, content: Union[str, NewsletterContent], subject: Optional[str]) -> MIMEMultipart:
+        if not subject:
+            subject = f"Your Daily Newsletter 😎💨🥴🤖🌍🇫🇷🇺🇸 - {datetime.now().strftime('%B %d, %Y')}"
+
+        # Create HTML version of the newsletter
+        if isinstance(content, NewsletterContent):
+            # Jinja is only imported once there is something to render
+            from .rendering import render_html, render_text
+            html_content = render_html(content)
+            content = render_text(content)
+        else:
             html_content = self._convert_to_html(content)
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.email_address
-            msg['To'] = self.to_email
-
-            # Add both plain text and HTML parts
-            text_part = MIMEText(content, 'plain', 'utf-8')
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            
-            msg.attach(text_part)
-            msg.attach(html_part)
-
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+
+        # Create message
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.email_address
+        msg['To'] = self.to_email
+
+        # Add both plain text and HTML parts
+        msg.attach(MIMEText(content, 'plain', 'utf-8'))
+        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        return msg
+
+    def deliver(self, msg: Union[MIMEMultipart, bytes], recipient: str) -> None:
+        """Send msg to one recipient, reconnecting once if the server dropped the open connection.
+
+        msg is either a message object or a finished message as stored in the mail spool.
+        Failing to connect is not retried here, since callers already retry per message
+        (the spool with backoff). A connection that failed is closed before raising.
+        """
+        reused = self._server is not None
+        try:
+            try:
+                self._send(msg, recipient)
+            except Exception as e:
+                if not (reused and _connection_lost(e)):
+                    raise
+                self._reconnect(e)
+                self._send(msg, recipient)
+        except Exception as e:
+            if _connection_lost(e):
+                self._drop()
+            raise
+
+    def _send(self, msg: Union[MIMEMultipart, bytes], recipient: str) -> None:
+        if isinstance(msg, bytes):
+            self._connection().sendmail(self.email_address, [recipient], msg)
+        else:
+            self._connection().send_message(msg, to_addrs=[recipient])
+
+    def enqueue(self, content: Union[str, NewsletterContent], spool: MailSpool, subject: str = None) -> List[int]:
+        """Render the newsletter once and store one finished message per recipient in the spool.
+
+        Nothing is sent here; a SpoolWorker delivers the messages, retrying failures.
+        """
+        msg = self._build_message(content, subject)
+        ids = []
+        for recipient in self.recipients:
+            del msg['To']
+            msg['To'] = recipient
+            ids.append(spool.enqueue(recipient, msg.as_bytes()))
+        return ids
+
+    def copy(self) -> "EmailSender":
+        """A sender with the same settings and its own connection, for use from another thread."""
+        return EmailSender(self.smtp_server, self.smtp_port, self.email_address, self.email_password,
+                           self.to_email, use_tls=self.use_tls, timeout=self.timeout)
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.use_tls:
                 server.starttls()
+            if self.email_password:
                 server.login(self.email_address, self.email_password)
-                server.send_message(msg)
-                
-            print(f"Newsletter sent successfully to {self.to_email}")
-            return True
-            
-        except Exception as e:
-            print(f"Failed to send newsletter: {e}")
-            traceback.print_exc()
-            return False
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _reconnect(self, error: Exception) -> None:
+        print(f"SMTP connection lost ({error}), reconnecting")
+        self._drop()
+
+    def _drop(self) -> None:
+        """Close a broken connection without the QUIT exchange."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def close(self) -> None:
+        """Log out and close the connection, if one is open."""
+        if self._server is None:
+            return
+        server, self._server = self._server, None
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
 
     def _convert_to_html(self, content: str) -> str:
-        html_template = Template("""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Your Daily Newsletter</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f4f4f4;
-        }
-        .container {
-            background-color: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 0 10px rgba(0,0,0,0.1);
-        }
-        h1 {
-            color: #2c3e50;
-            border-bottom: 2px solid #3498db;
-            padding-bottom: 10px;
-        }
-        h2 {
-            color: #1a73e8;
-            font-weight: bold;
-            font-size: 24px;
-            margin-top: 30px;
-            margin-bottom: 20px;
-            padding-bottom: 8px;
-            border-bottom: 2px solid #1a73e8;
-        }
-        h3 {
-            color: #2980b9;
-        }
-        a {
-            color: #3498db;
-            text-decoration: none;
-        }
-        a:hover {
-            text-decoration: underline;
-        }
-        .positive-article {
-            border-left: 4px solid #27ae60;
-            padding-left: 15px;
-            margin: 20px 0;
-            background-color: #f0f9f4;
-            padding: 15px;
-            border-radius: 5px;
-        }
-        .article {
-            border-left: 4px solid #3498db;
-            padding-left: 15px;
-            margin: 20px 0;
-            background-color: #f8f9fa;
-            padding: 15px;
-            border-radius: 5px;
-        }
-        .paper {
-            border-left: 4px solid #e74c3c;
-            padding-left: 15px;
-            margin: 20px 0;
-            background-color: #fdf2f2;
-            padding: 15px;
-            border-radius: 5px;
-        }
-        .paper-meta {
-            font-size: 14px;
-            color: #7f8c8d;
-            margin: 5px 0;
-        }
-        .footer {
-            margin-top: 30px;
-            padding-top: 20px;
-            border-top: 1px solid #bdc3c7;
-            text-align: center;
-            font-size: 14px;
-            color: #7f8c8d;
-        }
-        hr {
-            border: none;
-            border-top: 2px solid #bdc3c7;
-            margin: 30px 0;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        {{ content | replace('\n', '<br>') | replace('**', '<strong>') | replace('**', '</strong>') }}
-        <div class="footer">
-            <p>This newsletter was generated automatically by your AI agent.</p>
-            <p>Generated on {{ date }}</p>
-        </div>
-    </div>
-</body>
-</html>
-        """)
-        
-        # Enhanced markdown-like formatting
-        import re
-        formatted_content = content
-
-        # Convert horizontal rules (--- -> <hr>)
-        formatted_content = re.sub(r'^---+\s*$', r'<hr>', formatted_content, flags=re.MULTILINE)
-
-        # Convert headers (### Title -> <h3>Title</h3>)
-        formatted_content = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', formatted_content, flags=re.MULTILINE)
-        formatted_content = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', formatted_content, flags=re.MULTILINE)
-        formatted_content = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', formatted_content, flags=re.MULTILINE)
-
-        # Convert bold text (**text** -> <strong>text</strong>)
-        formatted_content = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', formatted_content)
-
-        # Convert Markdown links ([text](url) -> <a href="url">text</a>)
-        formatted_content = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', r'<a href="\2">\1</a>', formatted_content)
-
-        # Handle paper sections - wrap papers in appropriate divs
-        formatted_content = re.sub(r'(## Recent Papers.*?)(?=## |\Z)', self._format_papers_section, formatted_content, flags=re.DOTALL)
-
-        # Handle positive news section - wrap positive articles in green divs
-        formatted_content = re.sub(r'(## Positive News.*?)(?=## Tech News|## |\Z)', self._format_positive_news_section, formatted_content, flags=re.DOTALL)
-
-        # Handle tech news sections - wrap articles in blue divs
-        formatted_content = re.sub(r'(## Tech News.*?)(?=## Today|## Recent Papers|## |\Z)', self._format_news_section, formatted_content, flags=re.DOTALL)
-        
-        # Convert paragraphs (double newlines)
-        formatted_content = formatted_content.replace('\n\n', '</p><p>')
-        formatted_content = '<p>' + formatted_content + '</p>'
-        
-        # Convert single newlines to line breaks
-        formatted_content = formatted_content.replace('\n', '<br>')
-        
-        # Clean up empty paragraphs
-        formatted_content = formatted_content.replace('<p></p>', '')
-        formatted_content = formatted_content.replace('<p><br>', '<p>')
-        
-        return html_template.render(
-            content=formatted_content,
-            date=datetime.now().strftime('%B %d, %Y at %I:%M %p')
-        )
-
-    def _format_papers_section(self, match):
-        content = match.group(1)
-        # Wrap individual papers in paper divs
-        import re
-        content = re.sub(r'(\d+\.\s+<strong>.*?</strong>.*?)(?=\d+\.\s+<strong>|\Z)', r'<div class="paper">\1</div>', content, flags=re.DOTALL)
-        return content
-
-    def _format_positive_news_section(self, match):
-        content = match.group(1)
-        # Wrap individual positive articles in positive-article divs
-        import re
-        content = re.sub(r'(\d+\.\s+<strong>.*?</strong>.*?)(?=\d+\.\s+<strong>|\Z)', r'<div class="positive-article">\1</div>', content, flags=re.DOTALL)
-        return content
-
-    def _format_news_section(self, match):
-        content = match.group(1)
-        # Wrap individual articles in article divs
-        import re
-        content = re.sub(r'(\d+\.\s+<strong>.*?</strong>.*?)(?=\d+\.\s+<strong>|\Z)', r'<div class="article">\1</div>', content, flags=re.DOTALL)
-        return content
+        from .rendering import render_page
+        return render_page(render_markdown(content))
 
     def test_email_connection(self) -> bool:
+        """Open and authenticate the connection, which the next send then reuses."""
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_address, self.email_password)
-                print("Email connection test successful")
-                return True
+            self.close()
+            self._connection().noop()
+            print("Email connection test successful")
+            return True
         except Exception as e:
             print(f"Email connection test failed: {e}")
             traceback.print_exc()
-            return False
\ No newline at end of file
+            self.close()
+            return False
@@ -0,0 +1,170 @@
+import base64
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .cache import DiskCache
+from .metrics import RunMetrics
+
+if TYPE_CHECKING:
+    import requests
+
+USER_AGENT = 'MyFeed/1.0 (mailto:myfeed@example.com)'
+CHUNK_SIZE = 64 * 1024
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "ncid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so the same article maps to the same key across feeds and runs.
+
+    Lowercases the scheme and host, drops default ports, fragments, trailing
+    slashes and tracking parameters (utm_*, fbclid, ...), and sorts the query.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def create_session(max_hosts: int = 32, max_per_host: int = 4) -> "requests.Session":
+    """Create a keep-alive session that holds at most max_per_host connections to any host."""
+    # requests (with urllib3) takes a noticeable share of startup, so commands that never fetch skip it
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # pool_block makes extra requests to a busy host wait for a free connection
+    adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host, pool_block=True)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+class FeedFetcher:
+    """Download RSS feeds concurrently with a per-source timeout and an overall deadline.
+
+    With a cache, feeds are requested conditionally (If-None-Match / If-Modified-Since)
+    and a 304 Not Modified reuses the body stored by the previous run.
+    """
+
+    def __init__(self, timeout: float = 10.0, deadline: float = 30.0, max_workers: int = 16,
+                 session: Optional["requests.Session"] = None, cache: Optional[DiskCache] = None,
+                 metrics: Optional[RunMetrics] = None):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_workers = max_workers
+        self.session = session or create_session()
+        self.cache = cache
+        self.metrics = metrics or RunMetrics()
+        self.requests = 0
+        self.not_modified = 0
+        self._stats_lock = threading.Lock()
+
+    def fetch(self, url: str) -> bytes:
+        """Download a single feed, failing if it takes longer than the per-source timeout."""
+        return self._fetch(url)[0]
+
+    def _fetch(self, url: str) -> Tuple[bytes, bool]:
+        with self.metrics.span("feed", url) as span:
+            body, not_modified = self._fetch_conditional(url)
+            if not not_modified:
+                span.bytes = len(body)
+            return body, not_modified
+
+    def _fetch_conditional(self, url: str) -> Tuple[bytes, bool]:
+        cached = self._load_cached(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers['If-None-Match'] = cached["etag"]
+            if cached.get("last_modified"):
+                headers['If-Modified-Since'] = cached["last_modified"]
+
+        started = time.monotonic()
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and cached:
+                self._record(not_modified=True)
+                return base64.b64decode(cached["body"]), True
+            response.raise_for_status()
+            chunks = []
+            for chunk in response.iter_content(CHUNK_SIZE):
+                chunks.append(chunk)
+                if time.monotonic() - started > self.timeout:
+                    raise TimeoutError(f"feed took longer than {self.timeout}s")
+
+        body = b"".join(chunks)
+        self._record(not_modified=False)
+        self._store(url, response.headers, body)
+        return body, False
+
+    def _load_cached(self, url: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        try:
+            raw = self.cache.get(url)
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            print(f"Ignoring unreadable feed cache entry for {url}: {e}")
+            return None
+
+    def _store(self, url: str, response_headers, body: bytes) -> None:
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if self.cache is None or not (etag or last_modified):
+            return
+        self.cache.set(url, json.dumps({
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": base64.b64encode(body).decode("ascii"),
+        }).encode())
+
+    def _record(self, not_modified: bool) -> None:
+        with self._stats_lock:
+            self.requests += 1
+            self.not_modified += not_modified
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of feed requests answered with 304 Not Modified so far."""
+        return self.not_modified / self.requests if self.requests else 0.0
+
+    def fetch_all(self, urls: List[str]) -> Dict[str, Optional[bytes]]:
+        """Fetch all URLs in parallel. Sources that fail or miss the deadline map to None."""
+        results: Dict[str, Optional[bytes]] = {url: None for url in urls}
+        if not urls:
+            return results
+
+        not_modified = 0
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(results)))
+        futures = {executor.submit(self._fetch, url): url for url in results}
+        try:
+            done, not_done = wait(futures, timeout=self.deadline)
+            for future in done:
+                url = futures[future]
+                try:
+                    results[url], cached = future.result()
+                    not_modified += cached
+                except Exception as e:
+                    print(f"Error fetching feed {url}: {e}")
+            for future in not_done:
+                print(f"Timed out fetching feed {futures[future]} (deadline {self.deadline}s)")
+        finally:
+            # Don't block on stragglers past the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if self.cache is not None:
+            print(f"Feed cache: {not_modified}/{len(results)} feeds not modified "
+                  f"({not_modified / len(results):.0%} hit rate)")
+        return results
@@ -1,26 +1,57 @@
+import threading
 import traceback
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from .agent import NewsAgent
+from .config import AgentConfig
 from .email_sender import EmailSender
+from .spool import MailSpool, SpoolWorker
 
 class NewsletterGenerator:
-    def __init__(self, mistral_api_key: str, email_sender: EmailSender, topics: List[str]):
-        self.agent = NewsAgent(mistral_api_key)
+    def __init__(self, mistral_api_key: str, email_sender: EmailSender, topics: List[str],
+                 config: Optional[AgentConfig] = None):
+        self.agent = NewsAgent(mistral_api_key, config=config)
+        self.config = self.agent.config
         self.email_sender = email_sender
         self.topics = topics
+        spool_path = self.config.cache_path("mail")
+        self.spool = MailSpool(
+            spool_path,
+            max_attempts=self.config.mail_max_attempts,
+            retry_base=self.config.mail_retry_base
+        ) if spool_path else None
+        self.spool_worker = SpoolWorker(
+            self.spool, email_sender, workers=self.config.mail_workers
+        ) if self.spool is not None else None
 
     def generate_and_send_newsletter(self):
+        leftovers = None
         try:
             print(f"Starting newsletter generation at {datetime.now()}")
-            
+
+            if self.spool is not None and self.spool.pending():
+                # Messages left over by an earlier run go out while this one is generated
+                leftovers = threading.Thread(target=self._drain, daemon=True)
+                leftovers.start()
+
             # Generate newsletter content
             content = self.agent.generate_newsletter(self.topics)
             
             if content:
+                # The structured newsletter renders straight to HTML, without re-parsing the text
+                newsletter = self.agent.newsletter or content
+                if self.spool is not None:
+                    self._enqueue_and_send(newsletter, content)
+                    return
+
                 # Send newsletter
-                success = self.email_sender.send_newsletter(content)
+                with self.agent.metrics.span("smtp", self.email_sender.smtp_server) as span:
+                    success = self.email_sender.send_newsletter(newsletter)
+                    span.bytes = len(content.encode("utf-8"))
+                    if not success:
+                        span.error = "send failed"
                 if success:
+                    self.agent.mark_seen()
                     print("Newsletter generated and sent successfully!")
                 else:
                     print("Failed to send newsletter")
@@ -30,6 +61,37 @@ class NewsletterGenerator:
         except Exception as e:
             print(f"Error in newsletter generation/sending: {e}")
             traceback.print_exc()
+        finally:
+            if leftovers is not None:
+                leftovers.join()
+            self.agent.write_metrics()
+
+    def _enqueue_and_send(self, newsletter, content: str) -> None:
+        """Store the finished messages in the spool, then deliver them with retries.
+
+        Once stored, the newsletter counts as done: a delivery failure leaves the messages
+        in the spool for the next run instead of regenerating the newsletter.
+        """
+        self.email_sender.enqueue(newsletter, self.spool)
+        self.agent.mark_seen()
+        with self.agent.metrics.span("smtp", self.email_sender.smtp_server) as span:
+            delivered = self._drain(self.config.mail_drain_timeout)
+            span.bytes = len(content.encode("utf-8")) * delivered
+            pending = self.spool.pending()
+            if pending:
+                span.error = f"{pending} messages pending"
+        if pending:
+            print(f"Newsletter generated; {pending} messages left in the mail spool for the next run")
+        else:
+            print("Newsletter generated and sent successfully!")
+
+    def _drain(self, timeout: float = 0.0) -> int:
+        try:
+            return self.spool_worker.drain(timeout)
+        except Exception as e:
+            print(f"Error sending spooled mail: {e}")
+            traceback.print_exc()
+            return 0
 
     def run(self):
         """Generate and send newsletter once."""
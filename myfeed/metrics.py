@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_local = threading.local()
+
+
+def peak_rss() -> int:
+    """High-water mark of the process resident set size, in bytes (0 where unsupported)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Span:
+    """One timed unit of work: a graph node or a single external call."""
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.started = time.time()
+        self.wall = 0.0
+        self.bytes = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.peak_rss = 0
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "started": self.started,
+            "wall_seconds": round(self.wall, 6),
+            "bytes": self.bytes,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "peak_rss_bytes": self.peak_rss,
+            "error": self.error,
+        }
+
+
+def current_span() -> Optional[Span]:
+    """Innermost span open on this thread, if any."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def add_bytes(count: int) -> None:
+    """Credit transferred bytes to the span open on this thread; a no-op outside of one."""
+    span = current_span()
+    if span is not None:
+        span.bytes += count
+
+
+class RunMetrics:
+    """Thread-safe recorder of the spans of one newsletter run.
+
+    Node spans also sample the process' peak RSS when they end. Since branches run in
+    parallel, that is the high-water mark of the whole process up to then, not of the node alone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans: List[Span] = []
+            self.started = time.time()
+
+    @contextmanager
+    def span(self, kind: str, name: str) -> Iterator[Span]:
+        span = Span(kind, name)
+        stack = _local.__dict__.setdefault("stack", [])
+        stack.append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.wall = time.perf_counter() - started
+            stack.pop()
+            if kind == "node":
+                span.peak_rss = peak_rss()
+            with self._lock:
+                self.spans.append(span)
+
+    def report(self) -> Dict[str, Any]:
+        """Run summary: totals per node and per kind of external call, plus every span."""
+        with self._lock:
+            spans = list(self.spans)
+        nodes: Dict[str, Dict[str, Any]] = {}
+        calls: Dict[str, Dict[str, Any]] = {}
+        for span in spans:
+            if span.kind == "node":
+                nodes[span.name] = {
+                    "wall_seconds": round(span.wall, 6),
+                    "peak_rss_bytes": span.peak_rss,
+                    "error": span.error,
+                }
+                continue
+            totals = calls.setdefault(span.kind, {
+                "count": 0, "errors": 0, "wall_seconds": 0.0, "bytes": 0, "tokens_in": 0, "tokens_out": 0
+            })
+            totals["count"] += 1
+            totals["errors"] += span.error is not None
+            totals["wall_seconds"] = round(totals["wall_seconds"] + span.wall, 6)
+            totals["bytes"] += span.bytes
+            totals["tokens_in"] += span.tokens_in
+            totals["tokens_out"] += span.tokens_out
+        return {
+            "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "wall_seconds": round(time.time() - self.started, 6),
+            "peak_rss_bytes": peak_rss(),
+            "nodes": nodes,
+            "calls": calls,
+            "spans": [span.to_dict() for span in spans],
+        }
+
+    def write_json(self, path: str) -> None:
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the run summary in the Prometheus text format, for node_exporter's textfile collector."""
+        report = self.report()
+        lines = [
+            "# TYPE myfeed_run_duration_seconds gauge",
+            f"myfeed_run_duration_seconds {report['wall_seconds']}",
+            "# TYPE myfeed_run_peak_rss_bytes gauge",
+            f"myfeed_run_peak_rss_bytes {report['peak_rss_bytes']}",
+            "# TYPE myfeed_run_timestamp_seconds gauge",
+            f"myfeed_run_timestamp_seconds {self.started:.0f}",
+            "# TYPE myfeed_node_duration_seconds gauge",
+        ]
+        lines += [f'myfeed_node_duration_seconds{{node="{name}"}} {node["wall_seconds"]}'
+                  for name, node in report["nodes"].items()]
+        for metric, field in (("calls", "count"), ("call_errors", "errors"), ("call_duration_seconds", "wall_seconds"),
+                              ("call_bytes", "bytes"), ("call_tokens_in", "tokens_in"),
+                              ("call_tokens_out", "tokens_out")):
+            lines.append(f"# TYPE myfeed_{metric} gauge")
+            lines += [f'myfeed_{metric}{{kind="{kind}"}} {totals[field]}' for kind, totals in report["calls"].items()]
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+
+def _write_atomic(path: str, text: str) -> None:
+    # Readers such as the textfile collector must never see a half-written file
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".myfeed-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
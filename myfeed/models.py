@@ -0,0 +1,51 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class NewsItem(BaseModel):
+    title: str
+    summary: str
+    url: str
+    source: str
+    relevance_score: float
+
+class PaperItem(BaseModel):
+    title: str
+    authors: str
+    summary: str
+    url: str
+    year: str
+    citations: str
+    relevance_score: float
+    publication_date: str = ""  # Full publication date (YYYY-MM-DD)
+
+class StructuredArticle(BaseModel):
+    title: str
+    source: str
+    summary: str
+    url: str
+    relevance_score: float
+
+class StructuredPaper(BaseModel):
+    title: str
+    authors: str
+    year: str
+    citations: str
+    summary: str
+    url: str
+    relevance_score: float
+
+class NewsletterContent(BaseModel):
+    """Structured output for newsletter generation with separate sections for consistent formatting."""
+    introduction: str
+    positive_news: List[StructuredArticle]
+    latest_news: List[StructuredArticle]
+    todays_papers: List[StructuredPaper]
+    recent_papers: List[StructuredPaper]
+    closing_note: str
+    
+    def format(self) -> str:
+        """Format the newsletter content as a properly structured string."""
+        from .rendering import render_text
+        return render_text(self)
@@ -0,0 +1,108 @@
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from .metrics import RunMetrics
+
+if TYPE_CHECKING:
+    import requests
+
+OPENALEX_URL = "https://api.openalex.org/works"
+OPENALEX_MAILTO = "myfeed@example.com"
+MAX_PER_PAGE = 200
+# Only the work fields the agent reads; the full records are several times larger
+WORK_FIELDS = (
+    "id", "doi", "title", "display_name", "publication_year", "publication_date", "cited_by_count",
+    "authorships", "primary_location", "abstract_inverted_index",
+)
+
+
+def normalize_doi(doi: str) -> str:
+    """Bare lowercase DOI ("10.1234/abc"), whatever the prefix OpenAlex or a publisher used."""
+    doi = doi.strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            return doi[len(prefix):]
+    return doi
+
+
+def reconstruct_abstract(inverted_index: Any, max_chars: int = 1000) -> str:
+    """Rebuild abstract text from an OpenAlex inverted index ({word: [positions]}), up to max_chars.
+
+    A well-formed index holds each position from 0 to n-1 exactly once, so words are
+    dropped straight into a slot array of n entries instead of being sorted, and only
+    as many words as can fit in max_chars are joined. Indexes with gaps, repeated or
+    invalid positions take a slower path that skips the bad entries.
+    """
+    if not isinstance(inverted_index, dict) or not inverted_index:
+        return ""
+    slots = _dense_slots(inverted_index)
+    # n writes that leave no slot empty can only be a permutation of 0..n-1
+    if slots is None or None in slots:
+        slots = _sparse_slots(inverted_index)
+
+    # Every word adds at least one character with its separator
+    return " ".join(slots[:max_chars + 1])[:max_chars]
+
+
+def _dense_slots(inverted_index: Dict[Any, Any]) -> Optional[List[Optional[str]]]:
+    """Words dropped into n slots by position, or None as soon as an entry does not fit in 0..n-1."""
+    if not all(isinstance(word, str) and isinstance(positions, list) for word, positions in inverted_index.items()):
+        return None
+    n = sum(map(len, inverted_index.values()))
+    slots: List[Optional[str]] = [None] * n
+    for word, positions in inverted_index.items():
+        for position in positions:
+            # Negative indexes would wrap around and bools pass for 0 and 1
+            if type(position) is not int or not 0 <= position < n:
+                return None
+            slots[position] = word
+    return slots
+
+
+def _sparse_slots(inverted_index: Dict[Any, Any]) -> List[str]:
+    """Words in position order, ignoring non-string words and non-integer or negative positions."""
+    placed = {}
+    for word, positions in inverted_index.items():
+        if not isinstance(word, str) or not isinstance(positions, list):
+            continue
+        for position in positions:
+            if type(position) is int and position >= 0:
+                placed.setdefault(position, word)
+    return [placed[position] for position in sorted(placed)]
+
+
+def search_params(query: str, since: date) -> Dict[str, Any]:
+    """Parameters of a works search: most cited first, published since `since`, used fields only."""
+    return {
+        "search": query,
+        "sort": "cited_by_count:desc",  # Sort by most cited (relevance)
+        "filter": f"from_publication_date:{since.isoformat()}",
+        "select": ",".join(WORK_FIELDS),
+        "mailto": OPENALEX_MAILTO,  # Polite pool
+    }
+
+
+def iter_pages(session: "requests.Session", params: Dict[str, Any], page_size: int, budget: int,
+               timeout: float = 30.0, metrics: Optional[RunMetrics] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Walk the cursor pagination of a works search, yielding one page of works at a time.
+
+    Stops once `budget` works have been yielded or the results run out. Pages are only
+    requested when the caller asks for them, so it can stop early. Request errors propagate.
+    """
+    metrics = metrics or RunMetrics()
+    cursor = "*"
+    remaining = budget
+    while cursor and remaining > 0:
+        page_params = dict(params, per_page=min(page_size, remaining, MAX_PER_PAGE), cursor=cursor)
+        with metrics.span("openalex", params.get("search", "")) as span:
+            response = session.get(OPENALEX_URL, params=page_params, timeout=timeout)
+            response.raise_for_status()
+            span.bytes = len(response.content)
+            data = response.json()
+
+        works = data.get("results", [])[:remaining]
+        if not works:
+            return
+        remaining -= len(works)
+        yield works
+        cursor = (data.get("meta") or {}).get("next_cursor")
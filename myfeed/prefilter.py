@@ -0,0 +1,76 @@
+import re
+from typing import List, Sequence
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with plural 's' folded away."""
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def bm25_scores(documents: Sequence[str], queries: Sequence[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """Okapi BM25 score of every document for every query, as an (n_queries, n_documents) array.
+
+    Only query terms matter to BM25, so the term-frequency matrix is restricted to
+    the query vocabulary and filled with a single scatter-add over all document tokens.
+    """
+    query_tokens = [set(tokenize(query)) for query in queries]
+    vocab = {term: i for i, term in enumerate(dict.fromkeys(t for tokens in query_tokens for t in sorted(tokens)))}
+    n_docs = len(documents)
+    if not n_docs or not vocab:
+        return np.zeros((len(queries), n_docs))
+
+    doc_tokens = [tokenize(document) for document in documents]
+    lengths = np.array([len(tokens) for tokens in doc_tokens], dtype=np.int64)
+    term_ids = np.fromiter(
+        (vocab.get(token, -1) for tokens in doc_tokens for token in tokens),
+        dtype=np.int64,
+        count=int(lengths.sum())
+    )
+    doc_ids = np.repeat(np.arange(n_docs), lengths)
+    known = term_ids >= 0
+
+    tf = np.zeros((n_docs, len(vocab)))
+    np.add.at(tf, (doc_ids[known], term_ids[known]), 1.0)
+
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    average_length = lengths.mean() or 1.0
+    norm = k1 * (1 - b + b * lengths / average_length)
+    weights = idf * tf * (k1 + 1) / (tf + norm[:, None])
+
+    query_matrix = np.zeros((len(queries), len(vocab)))
+    for row, tokens in enumerate(query_tokens):
+        query_matrix[row, [vocab[token] for token in tokens]] = 1.0
+    return query_matrix @ weights.T
+
+
+def select_candidates(scores: np.ndarray, top_k: int, min_score: float = 0.0) -> List[int]:
+    """Indices of documents in the top_k of any query, or scoring at least min_score for one.
+
+    Documents that share no term with any query (score 0) are never selected.
+    """
+    if scores.size == 0:
+        return []
+    best = scores.max(axis=0)
+    keep = best >= min_score if min_score > 0 else np.zeros(scores.shape[1], dtype=bool)
+    if top_k > 0:
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+        rows = np.repeat(np.arange(scores.shape[0]), top.shape[1])
+        in_top = np.zeros_like(keep)
+        in_top[top.ravel()[scores[rows, top.ravel()] > 0]] = True
+        keep |= in_top
+    return np.flatnonzero(keep & (best > 0)).tolist()
@@ -0,0 +1,218 @@
+"""Render a NewsletterContent straight to the plain-text and HTML parts of the email."""
+from datetime import datetime
+from typing import Optional
+
+from jinja2 import DictLoader, Environment, select_autoescape
+from markupsafe import Markup
+
+from .models import NewsletterContent
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Your Daily Newsletter</title>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+            background-color: #f4f4f4;
+        }
+        .container {
+            background-color: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 0 10px rgba(0,0,0,0.1);
+        }
+        h1 {
+            color: #2c3e50;
+            border-bottom: 2px solid #3498db;
+            padding-bottom: 10px;
+        }
+        h2 {
+            color: #1a73e8;
+            font-weight: bold;
+            font-size: 24px;
+            margin-top: 30px;
+            margin-bottom: 20px;
+            padding-bottom: 8px;
+            border-bottom: 2px solid #1a73e8;
+        }
+        h3 {
+            color: #2980b9;
+        }
+        a {
+            color: #3498db;
+            text-decoration: none;
+        }
+        a:hover {
+            text-decoration: underline;
+        }
+        .positive-article {
+            border-left: 4px solid #27ae60;
+            padding-left: 15px;
+            margin: 20px 0;
+            background-color: #f0f9f4;
+            padding: 15px;
+            border-radius: 5px;
+        }
+        .article {
+            border-left: 4px solid #3498db;
+            padding-left: 15px;
+            margin: 20px 0;
+            background-color: #f8f9fa;
+            padding: 15px;
+            border-radius: 5px;
+        }
+        .paper {
+            border-left: 4px solid #e74c3c;
+            padding-left: 15px;
+            margin: 20px 0;
+            background-color: #fdf2f2;
+            padding: 15px;
+            border-radius: 5px;
+        }
+        .paper-meta {
+            font-size: 14px;
+            color: #7f8c8d;
+            margin: 5px 0;
+        }
+        .footer {
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #bdc3c7;
+            text-align: center;
+            font-size: 14px;
+            color: #7f8c8d;
+        }
+        hr {
+            border: none;
+            border-top: 2px solid #bdc3c7;
+            margin: 30px 0;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        {% block content %}{{ content }}{% endblock +%}
+        <div class="footer">
+            <p>This newsletter was generated automatically by your AI agent.</p>
+            <p>Generated on {{ date }}</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+# The Markdown layout NewsletterContent.format has always produced
+TEXT_TEMPLATE = """\
+{{ newsletter.introduction }}
+
+{% for heading, articles in [("Positive News", newsletter.positive_news), ("Tech News", newsletter.latest_news)] %}
+{% if articles %}
+## {{ heading }}
+
+{% for article in articles %}
+{{ loop.index }}. **{{ article.title }}** (Score: {{ article.relevance_score }})
+   Source: {{ article.source }}
+   Summary: {{ article.summary }}
+   [Read more]({{ article.url }})
+
+{% endfor %}
+{% endif %}
+{% endfor %}
+{% for heading, papers, empty in paper_sections(newsletter) %}
+## {{ heading }}
+
+{% for paper in papers %}
+{{ loop.index }}. **{{ paper.title }}** (Score: {{ paper.relevance_score }})
+   Authors: {{ paper.authors }}
+   Year: {{ paper.year }}
+   Citations: {{ paper.citations }}
+   Summary: {{ paper.summary }}
+   [Read paper]({{ paper.url }})
+
+{% else %}
+{{ empty }}
+
+{% endfor %}
+{% endfor %}
+{{ newsletter.closing_note }}"""
+
+# Same sections as the text part, with each item in its styled block
+HTML_TEMPLATE = """\
+{% extends "page.html" %}
+{% block content %}
+<p>{{ newsletter.introduction }}</p>
+{% for heading, articles, style in [("Positive News", newsletter.positive_news, "positive-article"),
+                                    ("Tech News", newsletter.latest_news, "article")] %}
+{% if articles %}
+<h2>{{ heading }}</h2>
+{% for article in articles %}
+<div class="{{ style }}"><p>{{ loop.index }}. <strong>{{ article.title }}</strong> (Score: {{ article.relevance_score }})<br>
+Source: {{ article.source }}<br>
+Summary: {{ article.summary }}<br>
+<a href="{{ article.url }}">Read more</a></p></div>
+{% endfor %}
+{% endif %}
+{% endfor %}
+{% for heading, papers, empty in paper_sections(newsletter) %}
+<h2>{{ heading }}</h2>
+{% for paper in papers %}
+<div class="paper"><p>{{ loop.index }}. <strong>{{ paper.title }}</strong> (Score: {{ paper.relevance_score }})</p>
+<p class="paper-meta">Authors: {{ paper.authors }}<br>
+Year: {{ paper.year }}<br>
+Citations: {{ paper.citations }}</p>
+<p>Summary: {{ paper.summary }}<br>
+<a href="{{ paper.url }}">Read paper</a></p></div>
+{% else %}
+<p>{{ empty }}</p>
+{% endfor %}
+{% endfor %}
+<p>{{ newsletter.closing_note }}</p>
+{% endblock %}"""
+
+
+def paper_sections(newsletter: NewsletterContent):
+    return [
+        ("Today's Papers", newsletter.todays_papers, "No papers published today."),
+        ("Recent Papers (Last 2 Weeks)", newsletter.recent_papers, "No recent papers found in the last 2 weeks."),
+    ]
+
+
+ENVIRONMENT = Environment(
+    loader=DictLoader({"page.html": PAGE_TEMPLATE, "newsletter.html": HTML_TEMPLATE, "newsletter.txt": TEXT_TEMPLATE}),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+ENVIRONMENT.globals["paper_sections"] = paper_sections
+
+# Compiled once at import rather than on every send
+PAGE = ENVIRONMENT.get_template("page.html")
+HTML = ENVIRONMENT.get_template("newsletter.html")
+TEXT = ENVIRONMENT.get_template("newsletter.txt")
+
+
+def _timestamp(generated: Optional[datetime]) -> str:
+    return (generated or datetime.now()).strftime('%B %d, %Y at %I:%M %p')
+
+
+def render_text(newsletter: NewsletterContent) -> str:
+    """Plain-text (Markdown) part of the email."""
+    return TEXT.render(newsletter=newsletter)
+
+
+def render_html(newsletter: NewsletterContent, generated: Optional[datetime] = None) -> str:
+    """HTML part of the email, with every field escaped."""
+    return HTML.render(newsletter=newsletter, date=_timestamp(generated))
+
+
+def render_page(body: str, generated: Optional[datetime] = None) -> str:
+    """Wrap an already rendered HTML body in the newsletter page."""
+    return PAGE.render(content=Markup(body), date=_timestamp(generated))
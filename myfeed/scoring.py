@@ -0,0 +1,159 @@
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics import RunMetrics
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions per second, in bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def status_code(exc: Exception) -> Optional[int]:
+    """HTTP status carried by an LLM client error, if any."""
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) or getattr(exc, "status_code", None)
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (Retry-After header), if given."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ScoringExecutor:
+    """Runs LLM calls concurrently under a concurrency cap and a shared rate limit.
+
+    Both limits hold across every caller of the executor, e.g. parallel graph branches
+    each running their own map().
+
+    Rate-limited (429) and server (5xx) errors are retried with exponential backoff
+    and full jitter, honouring Retry-After when the API sends it.
+    """
+
+    def __init__(self, llm, max_concurrency: int = 4, requests_per_second: float = 1.0,
+                 burst: Optional[float] = None, max_retries: int = 4,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 metrics: Optional[RunMetrics] = None):
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.limiter = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics or RunMetrics()
+
+    def invoke(self, prompt: Any) -> Any:
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                with self._slots, self.metrics.span("llm", "invoke") as span:
+                    response = self.llm.invoke(prompt)
+                    span.tokens_in, span.tokens_out = usage_tokens(prompt, response)
+                return response
+            except Exception as e:
+                if attempt == self.max_retries or status_code(e) not in RETRYABLE_STATUS:
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                print(f"LLM call failed with status {status_code(e)}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _invoke_or_none(self, prompt: Any) -> Any:
+        try:
+            return self.invoke(prompt)
+        except Exception as e:
+            print(f"Error calling LLM: {e}")
+            traceback.print_exc()
+            return None
+
+    def map(self, prompts: List[Any]) -> List[Any]:
+        """Invoke the LLM for every prompt concurrently. Failed calls yield None, order is kept."""
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(prompts))) as executor:
+            return list(executor.map(self._invoke_or_none, prompts))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting prompts."""
+    return len(text) // 4 + 1
+
+
+def usage_tokens(prompt: Any, response: Any) -> Tuple[int, int]:
+    """Input and output tokens of an LLM call, as reported by the API or else estimated."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return (usage.get("input_tokens") or estimate_tokens(str(prompt)),
+            usage.get("output_tokens") or estimate_tokens(str(getattr(response, "content", ""))))
+
+
+def plan_batches(costs: List[int], max_items: int, max_tokens: int, overhead: int = 0) -> List[List[int]]:
+    """Greedily pack item indices into batches of at most max_items and max_tokens each.
+
+    Items that don't fit the token budget on their own end up in a batch of one.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = overhead
+    for index, cost in enumerate(costs):
+        if current and (len(current) >= max_items or used + cost > max_tokens):
+            batches.append(current)
+            current, used = [], overhead
+        current.append(index)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_batch_results(data: Any, size: int) -> Dict[int, Dict[str, Any]]:
+    """Map 1-based item ids to {relevance_score, summary}, skipping malformed entries."""
+    if isinstance(data, dict):
+        data = data.get("results") or data.get("items") or []
+    if not isinstance(data, list):
+        return {}
+
+    results = {}
+    for entry in data:
+        try:
+            item_id = int(entry["id"])
+            score = float(entry["relevance_score"])
+            summary = entry["summary"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 1 <= item_id <= size and isinstance(summary, str):
+            results[item_id] = {"relevance_score": score, "summary": summary}
+    return results
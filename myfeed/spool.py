@@ -0,0 +1,182 @@
+import smtplib
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from .cache import SQLiteStore
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS messages ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, recipient TEXT NOT NULL, message BLOB NOT NULL, "
+    "created REAL NOT NULL, next_attempt REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+    "last_error TEXT, dead INTEGER NOT NULL DEFAULT 0)"
+)
+
+
+class SpooledMessage(NamedTuple):
+    id: int
+    recipient: str
+    message: bytes  # The finished MIME message, as sent on the wire
+    attempts: int
+
+
+def is_permanent(error: Exception) -> bool:
+    """Whether retrying cannot help: 5xx replies and refused recipients.
+
+    Connection problems, 4xx replies and authentication failures (a configuration
+    problem, not the message's) are worth retrying.
+    """
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+class MailSpool(SQLiteStore):
+    """Durable queue of outbound messages, one per recipient, backed by SQLite and safe to share between threads.
+
+    Failed messages are retried with exponential backoff (retry_base, doubling up to
+    retry_max seconds) and marked dead after max_attempts or a permanent error. Dead
+    messages stay in the spool with their last error for inspection.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 6, retry_base: float = 30.0, retry_max: float = 3600.0):
+        super().__init__(path)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._conn.execute(SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS messages_due ON messages (dead, next_attempt)")
+
+    def enqueue(self, recipient: str, message: bytes) -> int:
+        """Store a message for delivery as soon as possible and return its id."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO messages (recipient, message, created, next_attempt) VALUES (?, ?, ?, ?)",
+                (recipient, message, now, now)
+            )
+            return cursor.lastrowid
+
+    def claim(self, limit: int = 100, lease: float = 600.0) -> List[SpooledMessage]:
+        """Take up to `limit` due messages, hiding them from other claims for `lease` seconds.
+
+        A worker that dies mid-send leaves its messages to be claimed again once the lease runs out.
+        """
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so concurrent processes claim disjoint messages
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, recipient, message, attempts FROM messages "
+                    "WHERE dead = 0 AND next_attempt <= ? ORDER BY id LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self._conn.executemany("UPDATE messages SET next_attempt = ? WHERE id = ?",
+                                       [(now + lease, row[0]) for row in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [SpooledMessage(*row) for row in rows]
+
+    def sent(self, message_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+
+    def failed(self, message_id: int, error: str, permanent: bool = False) -> bool:
+        """Record a failed attempt and schedule the next one. Returns False if the message is now dead."""
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM messages WHERE id = ?", (message_id,)).fetchone()
+            if row is None:
+                return False
+            attempts = row[0] + 1
+            dead = permanent or attempts >= self.max_attempts
+            delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+            self._conn.execute(
+                "UPDATE messages SET attempts = ?, last_error = ?, dead = ?, next_attempt = ? WHERE id = ?",
+                (attempts, error, int(dead), time.time() + delay, message_id)
+            )
+            return not dead
+
+    def next_due(self) -> Optional[float]:
+        """Time of the earliest pending attempt, or None when nothing is left to send."""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(next_attempt) FROM messages WHERE dead = 0").fetchone()[0]
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages WHERE dead = 0").fetchone()[0]
+
+    def dead(self) -> List[SpooledMessage]:
+        """Messages given up on, for inspection or manual requeue."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, recipient, message, attempts FROM messages WHERE dead = 1 ORDER BY id"
+            ).fetchall()
+        return [SpooledMessage(*row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+class SpoolWorker:
+    """Drains a MailSpool through an EmailSender, over up to `workers` SMTP connections at once."""
+
+    CLAIM_SIZE = 100
+
+    def __init__(self, spool: MailSpool, email_sender, workers: int = 2):
+        self.spool = spool
+        self.email_sender = email_sender
+        self.workers = workers
+
+    def drain(self, timeout: float = 0.0) -> int:
+        """Send every due message and return how many were delivered.
+
+        Messages that fail are rescheduled; drain keeps waiting for their retries as long
+        as the next one falls within `timeout` seconds, and leaves the rest in the spool.
+        """
+        deadline = time.time() + timeout
+        delivered = 0
+        while True:
+            messages = self.spool.claim(self.CLAIM_SIZE)
+            if messages:
+                shares = [messages[i::self.workers] for i in range(self.workers)]
+                shares = [share for share in shares if share]
+                with ThreadPoolExecutor(max_workers=len(shares)) as executor:
+                    delivered += sum(executor.map(self._send, shares))
+                # A full claim may have left due messages behind; otherwise only retries remain
+                if len(messages) == self.CLAIM_SIZE or time.time() < deadline:
+                    continue
+            due = self.spool.next_due()
+            if due is None or due > deadline:
+                return delivered
+            time.sleep(max(0.0, due - time.time()))
+
+    def _send(self, messages: List[SpooledMessage]) -> int:
+        # One connection per worker thread
+        sender = self.email_sender.copy()
+        delivered = 0
+        try:
+            for message in messages:
+                try:
+                    sender.deliver(message.message, message.recipient)
+                except Exception as e:
+                    retrying = self.spool.failed(message.id, str(e), permanent=is_permanent(e))
+                    print(f"Failed to send newsletter to {message.recipient} "
+                          f"(attempt {message.attempts + 1}, {'will retry' if retrying else 'giving up'}): {e}")
+                    if not retrying:
+                        traceback.print_exc()
+                    continue
+                self.spool.sent(message.id)
+                delivered += 1
+                print(f"Newsletter sent successfully to {message.recipient}")
+        finally:
+            sender.close()
+        return delivered
@@ -0,0 +1,201 @@
+import base64
+import json
+import re
+import socket
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients in these tests routinely hang up early (timeouts, size caps)
+        pass
+
+
+class Reply:
+    """Stands in for a chat model's message."""
+
+    def __init__(self, content, usage_metadata=None):
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+
+class KeywordLLM:
+    """Scores items whose title mentions 'relevant' 8/10 and everything else 2/10."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        title = re.search(r"(?:Article|Paper) Title: (.*)", prompt).group(1)
+        score = 8 if "relevant" in title else 2
+        return Reply("```json\n" + json.dumps({"relevance_score": score, "summary": f"About {title}"}) + "\n```")
+
+
+class BatchKeywordLLM(KeywordLLM):
+    """Answers batch prompts with a JSON list, leaving out titles containing 'skip'."""
+
+    def invoke(self, prompt):
+        if "[1]" not in prompt:
+            return super().invoke(prompt)
+        self.prompts.append(prompt)
+        items = re.findall(r"\[(\d+)\]\s+(?:Article|Paper) Title: (.*)", prompt)
+        return Reply(json.dumps([
+            {"id": int(item_id), "relevance_score": 8 if "relevant" in title else 2, "summary": f"Batch {title}"}
+            for item_id, title in items if "skip" not in title
+        ]))
+
+
+@pytest.fixture
+def keyword_llm():
+    return KeywordLLM()
+
+
+@pytest.fixture
+def batch_keyword_llm():
+    return BatchKeywordLLM()
+
+
+class LocalServer:
+    """Tiny HTTP server serving canned responses, for tests that need real sockets."""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                route = server.routes.get(self.path)
+                if route is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                if callable(route):
+                    route = route(self)
+                status, headers, body, delay = route
+                time.sleep(delay)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def add(self, path, body=b"", status=200, headers=None, delay=0.0):
+        self.routes[path] = (status, headers or {}, body, delay)
+        return self.url(path)
+
+
+@pytest.fixture
+def local_server():
+    server = LocalServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def closed_port():
+    """A local port nothing listens on, so connecting to it is refused."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalSMTPServer:
+    """Minimal plaintext SMTP server (EHLO, AUTH PLAIN, MAIL, RCPT, DATA), standing in for aiosmtpd.
+
+    Records connections, logins and delivered messages. `reject` holds recipients refused
+    with `reject_reply`, and `drop_after` closes each connection after that many messages.
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.logins = []
+        self.messages = []  # (sender, recipients, raw message)
+        self.reject = set()
+        self.reject_reply = "550 No such user"
+        self.drop_after = None
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                server.connections += 1
+                self.reply("220 localhost ESMTP")
+                sender, recipients, delivered = None, [], 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command, _, argument = line.decode().rstrip("\r\n").partition(" ")
+                    command = command.upper()
+                    if command in ("EHLO", "HELO"):
+                        self.reply("250-localhost")
+                        self.reply("250 AUTH PLAIN")
+                    elif command == "AUTH":
+                        _, user, password = base64.b64decode(argument.split()[1]).decode().split("\0")
+                        server.logins.append((user, password))
+                        self.reply("235 Authentication successful")
+                    elif command == "MAIL":
+                        sender, recipients = argument.split(":", 1)[1].strip("<> "), []
+                        self.reply("250 OK")
+                    elif command == "RCPT":
+                        recipient = argument.split(":", 1)[1].strip("<> ")
+                        if recipient in server.reject:
+                            self.reply(server.reject_reply)
+                        else:
+                            recipients.append(recipient)
+                            self.reply("250 OK")
+                    elif command == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        for data_line in iter(self.rfile.readline, b".\r\n"):
+                            data.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                        server.messages.append((sender, recipients, b"".join(data)))
+                        self.reply("250 OK")
+                        delivered += 1
+                        if server.drop_after and delivered >= server.drop_after:
+                            return
+                    elif command in ("RSET", "NOOP"):
+                        self.reply("250 OK")
+                    elif command == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+
+@pytest.fixture
+def smtp_server():
+    server = LocalSMTPServer()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
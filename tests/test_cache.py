@@ -0,0 +1,90 @@
+import time
+
+from myfeed.cache import DiskCache, SeenStore
+
+
+def test_values_persist_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer = DiskCache(path)
+    writer.set("key", b"value")
+    writer.close()
+
+    cache = DiskCache(path)
+
+    assert cache.get("key") == b"value"
+    assert cache.get("other") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), ttl=0.1)
+    cache.set("old", b"value")
+    time.sleep(0.15)
+    cache.set("new", b"value")
+
+    assert cache.get("old") is None
+    assert cache.get("new") == b"value"
+    assert len(cache) == 1
+    cache.close()
+
+
+def test_purge_expired(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), ttl=0.05)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    time.sleep(0.1)
+
+    assert cache.purge_expired() == 2
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_evicts_least_recently_used_past_max_bytes(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_bytes=30)
+    for key in ("a", "b", "c"):
+        cache.set(key, b"x" * 10)
+        time.sleep(0.01)
+    cache.get("a")  # "b" is now the least recently used
+    time.sleep(0.01)
+
+    cache.set("d", b"x" * 10)
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+    cache.close()
+
+
+def test_evicts_past_max_entries(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, b"x")
+        time.sleep(0.01)
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    cache.close()
+
+
+def test_seen_store_remembers_keys_across_instances(tmp_path):
+    path = str(tmp_path / "seen.sqlite")
+    writer = SeenStore(path)
+    writer.add(["https://example.com/a", "https://openalex.org/W1"])
+    writer.close()
+
+    store = SeenStore(path)
+
+    assert store.seen(["https://example.com/a", "https://example.com/b", "https://openalex.org/W1"]) == {
+        "https://example.com/a", "https://openalex.org/W1"
+    }
+    store.close()
+
+
+def test_seen_store_forgets_keys_past_retention(tmp_path):
+    store = SeenStore(str(tmp_path / "seen.sqlite"), retention=0.05)
+    store.add(["old"])
+    time.sleep(0.1)
+    store.add(["new"])
+
+    assert store.seen(["old", "new"]) == {"new"}
+    store.close()
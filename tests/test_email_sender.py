@@ -0,0 +1,115 @@
+from email import message_from_bytes
+
+from myfeed.models import NewsletterContent, StructuredArticle, StructuredPaper
+from myfeed.email_sender import EmailSender, render_markdown
+
+
+def test_renders_headings_rules_bold_and_links():
+    html = render_markdown("# Title\n## Section **hot**\n### Sub\n---\nSee **this** [link](https://example.com/a?b=1).")
+
+    assert html == (
+        "<p><h1>Title</h1><br><h2>Section <strong>hot</strong></h2><br><h3>Sub</h3><br><hr><br>"
+        'See <strong>this</strong> <a href="https://example.com/a?b=1">link</a>.</p>'
+    )
+
+
+def test_blank_lines_separate_paragraphs():
+    assert render_markdown("\nIntro\n\nFirst\nline two\n\n\nLast\n\n") == "<p>Intro</p><p>First<br>line two</p><p>Last</p>"
+
+
+def test_markers_that_do_not_apply_are_left_alone():
+    assert render_markdown("a ** b\n#### deep\n##no space\n[no](link") == (
+        "<p>a ** b<br>#### deep<br>##no space<br>[no](link</p>"
+    )
+
+
+def test_converts_formatted_newsletter():
+    article = StructuredArticle(title="Rockets", source="Example", summary="Launch.", url="https://example.com/r",
+                                relevance_score=8.0)
+    paper = StructuredPaper(title="On rockets", authors="A. Author", year="2026", citations="3", summary="Study.",
+                            url="https://doi.org/1", relevance_score=9.0)
+    content = NewsletterContent(introduction="Hey", positive_news=[], latest_news=[article], todays_papers=[],
+                                recent_papers=[paper], closing_note="Bye").format()
+
+    html = EmailSender("smtp.example.com", 587, "me@example.com", "pw", "you@example.com")._convert_to_html(content)
+
+    assert "<p><h2>Tech News</h2></p>" in html
+    assert ('<p>1. <strong>Rockets</strong> (Score: 8.0)<br>   Source: Example<br>   Summary: Launch.<br>'
+            '   <a href="https://example.com/r">Read more</a></p>') in html
+    assert "<p>No papers published today.</p>" in html
+    assert "<p>Bye</p>" in html and "Generated on" in html
+
+
+def make_sender(smtp_server, to_email="you@example.com"):
+    return EmailSender("127.0.0.1", smtp_server.port, "me@example.com", "pw", to_email, use_tls=False, timeout=5)
+
+
+def test_batch_reuses_one_authenticated_connection(smtp_server):
+    recipients = [f"reader{i}@example.com" for i in range(5)]
+
+    results = make_sender(smtp_server).send_batch("Hey\n\nBye", recipients, subject="Today")
+
+    assert results == {recipient: True for recipient in recipients}
+    assert smtp_server.connections == 1
+    assert smtp_server.logins == [("me@example.com", "pw")]
+    assert [message[1] for message in smtp_server.messages] == [[recipient] for recipient in recipients]
+    # Each copy is addressed to its own recipient only
+    assert [message_from_bytes(message[2])["To"] for message in smtp_server.messages] == recipients
+
+
+def test_batch_reconnects_when_the_server_drops_the_connection(smtp_server):
+    smtp_server.drop_after = 2
+    recipients = [f"reader{i}@example.com" for i in range(5)]
+
+    results = make_sender(smtp_server).send_batch("Hey", recipients)
+
+    assert all(results.values()) and len(smtp_server.messages) == 5
+    assert smtp_server.connections == 3
+
+
+def test_batch_reports_refused_recipients_and_carries_on(smtp_server):
+    smtp_server.reject = {"gone@example.com"}
+    recipients = ["a@example.com", "gone@example.com", "b@example.com"]
+
+    results = make_sender(smtp_server).send_batch("Hey", recipients)
+
+    assert results == {"a@example.com": True, "gone@example.com": False, "b@example.com": True}
+    assert smtp_server.connections == 1
+
+
+def test_send_newsletter_reuses_tested_connection_for_every_recipient(smtp_server):
+    sender = make_sender(smtp_server, to_email="a@example.com, b@example.com")
+
+    assert sender.test_email_connection()
+    assert sender.send_newsletter("Hey")
+
+    assert smtp_server.connections == 1
+    assert [message[1] for message in smtp_server.messages] == [["a@example.com"], ["b@example.com"]]
+
+
+def test_send_newsletter_fails_if_any_recipient_is_refused(smtp_server):
+    smtp_server.reject = {"b@example.com"}
+
+    assert not make_sender(smtp_server, to_email="a@example.com,b@example.com").send_newsletter("Hey")
+    assert len(smtp_server.messages) == 1
+
+
+def test_batch_tries_each_failed_connect_once_and_drops_the_broken_connection(smtp_server, monkeypatch):
+    smtp_server.drop_after = 1
+    sender = make_sender(smtp_server)
+    connect, attempts = sender._connect, []
+
+    def connect_once():
+        attempts.append(len(attempts))
+        if len(attempts) > 1:
+            raise ConnectionRefusedError()
+        return connect()
+
+    monkeypatch.setattr(sender, "_connect", connect_once)
+    recipients = ["a@example.com", "b@example.com", "c@example.com"]
+
+    results = sender.send_batch("Hey", recipients)
+
+    assert results == {"a@example.com": True, "b@example.com": False, "c@example.com": False}
+    # b reconnects after the drop, c connects afresh: neither refused connect is retried
+    assert len(attempts) == 3
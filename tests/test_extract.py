@@ -0,0 +1,135 @@
+from unittest.mock import patch
+
+import pytest
+
+from myfeed.extract import ENGINES, StdlibEngine, VisibleTextParser, fetch_article_text, get_engine
+from myfeed.fetch import create_session
+from myfeed.metrics import RunMetrics
+
+PAGE = b"""<html><head><title>T</title><style>p { color: red; }</style>
+<script>var tracking = "do not include";</script></head>
+<body><p>Hello   world.</p>
+<p>Second &amp; final paragraph.</p></body></html>"""
+
+
+def test_extracts_visible_text_only(local_server):
+    url = local_server.add("/page", PAGE, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    text = fetch_article_text(create_session(), url)
+
+    assert text == "Hello world. Second & final paragraph."
+
+
+def test_skips_non_html_content(local_server):
+    url = local_server.add("/file.pdf", b"%PDF-1.7 ...", headers={"Content-Type": "application/pdf"})
+
+    assert fetch_article_text(create_session(), url) == ""
+
+
+def test_truncates_to_max_chars(local_server):
+    body = b"<html><body>" + b"<p>lorem ipsum dolor</p>" * 500 + b"</body></html>"
+    url = local_server.add("/long", body, headers={"Content-Type": "text/html"})
+
+    text = fetch_article_text(create_session(), url, max_chars=100)
+
+    assert len(text) == 100
+    assert text.startswith("lorem ipsum dolor lorem")
+
+
+def test_stops_reading_at_byte_cap(local_server):
+    body = b"<html><body><p>" + b"word " * 400_000 + b"</p></body></html>"
+    url = local_server.add("/huge", body, headers={"Content-Type": "text/html"})
+
+    text = fetch_article_text(create_session(), url, max_chars=10_000_000, max_bytes=64 * 1024)
+
+    # Only the first chunks up to the cap are parsed, not the full 2MB page
+    assert 0 < len(text) < 100 * 1024
+
+
+def test_decodes_declared_charset(local_server):
+    body = "<p>Café déjà vu</p>".encode("latin-1")
+    url = local_server.add("/latin1", body, headers={"Content-Type": "text/html; charset=ISO-8859-1"})
+
+    assert fetch_article_text(create_session(), url) == "Café déjà vu"
+
+
+ARTICLE_PAGE = """<html><head><title>Site</title></head><body>
+<header><a href="/">Home</a> <a href="/tech">Tech</a></header>
+<nav><ul><li>Latest</li><li>Popular</li></ul></nav>
+<aside>Sign up for our newsletter!</aside>
+<article><h1>Rockets are back</h1>
+<p>%s</p><script>track()</script></article>
+<footer>Copyright 2026 Example Media</footer>
+</body></html>""" % ("The launch went well. " * 20)
+
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_engines_extract_main_article_body(name):
+    if name in ("lxml", "selectolax"):
+        pytest.importorskip(name)
+
+    text = get_engine(name).extract(ARTICLE_PAGE)
+
+    assert text.startswith("Rockets are back The launch went well.")
+    for chrome in ("Home", "Latest", "newsletter", "Copyright", "track()"):
+        assert chrome not in text
+
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_engines_fall_back_to_body_without_article(name):
+    if name in ("lxml", "selectolax"):
+        pytest.importorskip(name)
+
+    text = get_engine(name).extract("<html><body><nav>Menu</nav><div><p>Just a page.</p></div></body></html>")
+
+    assert text == "Just a page."
+
+
+@pytest.mark.parametrize("name", sorted(ENGINES))
+def test_engines_handle_pages_without_closing_head(name):
+    if name in ("lxml", "selectolax"):
+        pytest.importorskip(name)
+
+    page = "<html><head><title>Site</title><meta charset=utf-8><style>p {}</style><body><p>Just a page.</p></body></html>"
+
+    assert get_engine(name).extract(page) == "Just a page."
+
+
+def test_streaming_parser_handles_pages_without_closing_head(local_server):
+    body = b"<html><head><title>Site</title><link rel=stylesheet href=a.css><p>Just a page.</p></html>"
+    url = local_server.add("/no-head-end", body, headers={"Content-Type": "text/html"})
+
+    assert fetch_article_text(create_session(), url) == "Just a page."
+
+
+def test_get_engine_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        get_engine("regex")
+
+
+def test_fetch_article_text_uses_engine(local_server):
+    url = local_server.add("/article", ARTICLE_PAGE.encode(), headers={"Content-Type": "text/html"})
+
+    text = fetch_article_text(create_session(), url, max_chars=50, engine=get_engine("bs4"))
+
+    assert text == "Rockets are back The launch went well. The launch "
+
+
+def test_other_engines_skip_the_stream_parse_and_stop_after_the_article(local_server):
+    page = ARTICLE_PAGE.encode() + b"<!-- " + b"comments " * 200_000 + b"-->"
+    url = local_server.add("/article-comments", page, headers={"Content-Type": "text/html"})
+    metrics = RunMetrics()
+
+    with patch.object(VisibleTextParser, "feed", side_effect=AssertionError("parsed twice")), \
+            metrics.span("article", url) as span:
+        text = fetch_article_text(create_session(), url, max_chars=50, engine=get_engine("bs4"))
+
+    assert text == "Rockets are back The launch went well. The launch "
+    # Reading stopped at </article>, long before the 1.8MB tail or the byte cap
+    assert 0 < span.bytes < 64 * 1024
+
+
+def test_auto_prefers_stdlib_over_bs4(monkeypatch):
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: object() if name == "bs4" else None)
+
+    assert isinstance(get_engine("auto"), StdlibEngine)
@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from myfeed.cache import DiskCache
+from myfeed.fetch import FeedFetcher, canonical_url, create_session
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Local Feed</title>
+<item><title>Hello</title><link>http://example.com/a</link></item>
+</channel></rss>"""
+
+
+def test_fetch_all_downloads_feeds_concurrently(local_server):
+    """Total wall time should track the slowest feed, not the sum of all of them."""
+    urls = [local_server.add(f"/feed{i}", RSS, delay=0.3) for i in range(5)]
+
+    started = time.monotonic()
+    results = FeedFetcher(timeout=5, deadline=10).fetch_all(urls)
+    elapsed = time.monotonic() - started
+
+    assert all(results[url] == RSS for url in urls)
+    assert elapsed < 1.0
+
+
+def test_fetch_all_maps_failures_to_none(local_server):
+    ok = local_server.add("/ok", RSS)
+    broken = local_server.add("/broken", b"oops", status=500)
+    missing = local_server.url("/missing")
+
+    results = FeedFetcher(timeout=5, deadline=10).fetch_all([ok, broken, missing])
+
+    assert results == {ok: RSS, broken: None, missing: None}
+
+
+def test_fetch_all_respects_overall_deadline(local_server):
+    fast = local_server.add("/fast", RSS)
+    slow = local_server.add("/slow", RSS, delay=2.0)
+
+    started = time.monotonic()
+    results = FeedFetcher(timeout=5, deadline=0.5).fetch_all([fast, slow])
+
+    assert time.monotonic() - started < 1.5
+    assert results[fast] == RSS
+    assert results[slow] is None
+
+
+def test_fetch_all_respects_per_source_timeout(local_server):
+    slow = local_server.add("/slow", RSS, delay=1.0)
+
+    results = FeedFetcher(timeout=0.2, deadline=5).fetch_all([slow])
+
+    assert results[slow] is None
+
+
+def test_session_limits_connections_per_host(local_server):
+    url = local_server.add("/slow", b"ok", delay=0.2)
+    session = create_session(max_per_host=2)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: session.get(url, timeout=5).content, range(8)))
+    elapsed = time.monotonic() - started
+
+    # 8 requests through 2 connections take at least 4 rounds
+    assert elapsed >= 0.75
+
+
+def test_conditional_get_reuses_cached_feed_across_runs(local_server, tmp_path):
+    def feed(handler):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {}, b"", 0
+        return 200, {"ETag": '"v1"', "Last-Modified": "Tue, 13 Oct 2026 08:00:00 GMT"}, RSS, 0
+
+    local_server.routes["/feed"] = feed
+    url = local_server.url("/feed")
+    cache_path = str(tmp_path / "feeds.sqlite")
+
+    first = FeedFetcher(cache=DiskCache(cache_path))
+    assert first.fetch_all([url]) == {url: RSS}
+    assert first.hit_rate == 0.0
+
+    second = FeedFetcher(cache=DiskCache(cache_path))
+    assert second.fetch_all([url]) == {url: RSS}
+    assert second.hit_rate == 1.0
+
+    _, headers = local_server.requests[-1]
+    assert headers["If-None-Match"] == '"v1"'
+    assert headers["If-Modified-Since"] == "Tue, 13 Oct 2026 08:00:00 GMT"
+
+
+def test_feeds_without_validators_are_not_cached(local_server, tmp_path):
+    url = local_server.add("/plain", RSS)
+    cache = DiskCache(str(tmp_path / "feeds.sqlite"))
+
+    FeedFetcher(cache=cache).fetch_all([url])
+
+    assert len(cache) == 0
+    assert "If-None-Match" not in local_server.requests[-1][1]
+
+
+def test_canonical_url_drops_tracking_and_cosmetic_differences():
+    assert canonical_url("HTTPS://Example.com:443/story/?utm_source=rss&b=2&a=1#comments") == \
+        "https://example.com/story?a=1&b=2"
+    assert canonical_url("https://example.com/story?fbclid=abc") == canonical_url("https://example.com/story/")
+    assert canonical_url("http://example.com:8080") == "http://example.com:8080/"
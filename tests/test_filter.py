@@ -0,0 +1,114 @@
+import pytest
+
+from myfeed.agent import NewsAgent, NewsletterState
+from myfeed.config import AgentConfig
+
+
+@pytest.fixture
+def news_agent(keyword_llm):
+    agent = NewsAgent(mistral_api_key="test-api-key")
+    agent.llm = agent.scorer.llm = keyword_llm
+    agent.scorer.limiter.rate = 0
+    return agent
+
+
+def test_filter_articles_keeps_relevant_articles(news_agent):
+    state = NewsletterState(topics=["AI"], raw_articles=[
+        {"title": f"{kind} story {i}", "summary": "", "content": "", "url": f"https://example.com/{kind}{i}",
+         "source": "Example"}
+        for i in range(3) for kind in ("relevant", "boring")
+    ])
+
+    state = news_agent._filter_articles(state)
+
+    assert sorted(item.title for item in state.filtered_articles) == [f"relevant story {i}" for i in range(3)]
+    assert state.filtered_articles[0].summary.startswith("About relevant story")
+    assert len(news_agent.llm.prompts) == 6
+
+
+def test_filter_papers_skips_untitled_papers(news_agent):
+    state = NewsletterState(topics=["AI"], raw_papers=[
+        {"title": "A relevant paper", "url": "https://doi.org/1"},
+        {"url": "https://doi.org/2"},
+        {"title": "A boring paper", "url": "https://doi.org/3"},
+    ])
+
+    state = news_agent._filter_papers(state)
+
+    assert [paper.title for paper in state.recent_papers] == ["A relevant paper"]
+    assert len(news_agent.llm.prompts) == 2
+
+
+def test_only_items_shown_in_the_newsletter_are_recorded_as_seen(news_agent, monkeypatch):
+    invoke = news_agent.llm.invoke
+    monkeypatch.setattr(news_agent.llm, "invoke", lambda prompt: None if "garbled" in prompt else invoke(prompt))
+    titles = ["garbled story", "boring story"] + [f"relevant story {i}" for i in range(8)]
+    state = NewsletterState(topics=["AI"], raw_articles=[
+        {"title": title, "summary": "", "content": "", "url": f"https://example.com/{i}", "source": "Example"}
+        for i, title in enumerate(titles)
+    ])
+
+    state = news_agent._filter_articles(state)
+
+    # Failed, low-scoring and relevant items beyond the top 6 get another chance next run
+    assert len(state.filtered_articles) == 6
+    assert state.new_item_keys == [item.url for item in state.filtered_articles]
+
+
+def test_batch_scoring_packs_items_and_falls_back_per_item(news_agent, batch_keyword_llm):
+    news_agent.config.score_batch_size = 3
+    news_agent.llm = news_agent.scorer.llm = batch_keyword_llm
+    titles = ["relevant a", "boring b", "relevant skip c", "relevant d", "boring e"]
+    state = NewsletterState(topics=["AI"], raw_articles=[
+        {"title": title, "summary": "", "content": "", "url": f"https://example.com/{i}", "source": "Example"}
+        for i, title in enumerate(titles)
+    ])
+
+    state = news_agent._filter_articles(state)
+
+    # Two batch requests ([a, b, c] and [d, e]), then c alone since the batch answer left it out
+    assert len(news_agent.llm.prompts) == 3
+    assert "[1]" not in news_agent.llm.prompts[-1]
+    assert {item.title: item.summary for item in state.filtered_articles} == {
+        "relevant a": "Batch relevant a",
+        "relevant d": "Batch relevant d",
+        "relevant skip c": "About relevant skip c",
+    }
+
+
+def test_scores_are_cached_across_runs_for_the_same_topics(tmp_path, keyword_llm):
+    config = AgentConfig(cache_dir=str(tmp_path), llm_requests_per_second=0)
+    articles = [
+        {"title": f"relevant story {i}", "summary": "", "content": "", "url": f"https://example.com/{i}",
+         "source": "Example"}
+        for i in range(3)
+    ]
+
+    first = NewsAgent(mistral_api_key="test-api-key", config=config)
+    first.llm = first.scorer.llm = keyword_llm
+    first._filter_articles(NewsletterState(topics=["AI"], raw_articles=articles))
+    assert len(keyword_llm.prompts) == 3
+
+    rerun = NewsAgent(mistral_api_key="test-api-key", config=config)
+    rerun.llm = rerun.scorer.llm = keyword_llm
+    state = rerun._filter_articles(NewsletterState(topics=["AI"], raw_articles=articles))
+    assert len(keyword_llm.prompts) == 3  # No new prompts
+    assert (rerun.score_cache.hits, rerun.score_cache.misses) == (3, 0)
+    assert len(state.filtered_articles) == 3
+
+    # Different topics change the rating, so nothing is reused
+    rerun._filter_articles(NewsletterState(topics=["Biology"], raw_articles=articles))
+    assert len(keyword_llm.prompts) == 6
+
+
+def test_prefilter_keeps_obvious_misses_away_from_the_llm(news_agent):
+    news_agent.config.prefilter_top_k = 2
+    state = NewsletterState(topics=["AI"], raw_articles=[
+        {"title": title, "summary": "", "content": "", "url": f"https://example.com/{i}", "source": "Example"}
+        for i, title in enumerate(["relevant AI news", "more relevant AI", "knitting patterns", "AI again"])
+    ])
+
+    news_agent._filter_articles(state)
+
+    assert len(news_agent.llm.prompts) == 2
+    assert news_agent.llm_calls_saved == 2
@@ -0,0 +1,75 @@
+import pytest
+
+from myfeed.agent import CLOSING_NOTE, INTRODUCTION, NewsAgent, NewsItem, NewsletterState, PaperItem
+from myfeed.config import AgentConfig
+from conftest import Reply
+
+
+class IntroLLM:
+    def __init__(self, reply="Hey Matthieu, rockets are back!", error=None):
+        self.reply = reply
+        self.error = error
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        if self.error:
+            raise self.error
+        return Reply(self.reply)
+
+    def with_structured_output(self, schema):
+        raise AssertionError("direct mode must not ask the LLM for the whole newsletter")
+
+
+def make_agent(**overrides):
+    agent = NewsAgent(mistral_api_key="test-api-key", config=AgentConfig(newsletter_mode="direct", **overrides))
+    agent.llm = agent.scorer.llm = IntroLLM()
+    agent.scorer.limiter.rate = 0
+    return agent
+
+
+def make_state():
+    article = NewsItem(title="Rockets are back", summary="A launch.", url="https://example.com/a",
+                       source="Example", relevance_score=8.0)
+    paper = PaperItem(title="On rockets", authors="A. Author", summary="We study rockets.", url="https://doi.org/1",
+                      year="2026", citations="3", relevance_score=9.0, publication_date="2026-10-17")
+    return NewsletterState(topics=["space"], filtered_articles=[article], today_papers=[paper])
+
+
+def test_direct_mode_builds_newsletter_without_llm():
+    agent = make_agent()
+
+    state = agent._generate_newsletter(make_state())
+    content = state.newsletter_content
+
+    assert state.newsletter.format() == content
+    assert content.startswith(INTRODUCTION)
+    assert content.endswith(CLOSING_NOTE)
+    assert "## Tech News" in content and "1. **Rockets are back** (Score: 8.0)" in content
+    assert "1. **On rockets** (Score: 9.0)" in content and "   Authors: A. Author" in content
+    assert "No recent papers found in the last 2 weeks." in content
+    assert agent.llm.prompts == []
+
+
+def test_direct_mode_asks_llm_for_introduction_only():
+    agent = make_agent(newsletter_llm_intro=True)
+
+    content = agent._generate_newsletter(make_state()).newsletter_content
+
+    assert content.startswith("Hey Matthieu, rockets are back!")
+    assert len(agent.llm.prompts) == 1
+    assert "- Rockets are back" in agent.llm.prompts[0] and "- On rockets" in agent.llm.prompts[0]
+
+
+def test_introduction_falls_back_to_fixed_text_on_error():
+    agent = make_agent(newsletter_llm_intro=True)
+    agent.llm = agent.scorer.llm = IntroLLM(error=RuntimeError("boom"))
+
+    content = agent._generate_newsletter(make_state()).newsletter_content
+
+    assert content.startswith(INTRODUCTION)
+
+
+def test_rejects_unknown_newsletter_mode():
+    with pytest.raises(ValueError):
+        NewsAgent(mistral_api_key="test-api-key", config=AgentConfig(newsletter_mode="fancy"))
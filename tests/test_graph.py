@@ -0,0 +1,94 @@
+import threading
+import time
+
+from myfeed.agent import NewsAgent, NewsItem
+
+DELAY = 0.3
+
+
+class SlowAgent(NewsAgent):
+    """Agent whose nodes just sleep and record what they saw, to check the graph wiring."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+        super().__init__(mistral_api_key="test-api-key")
+
+    def _record(self, name, state):
+        with self.lock:
+            self.calls.append((name, time.monotonic()))
+        time.sleep(DELAY)
+
+    def _scrape_positive_news(self, state):
+        self._record("scrape_positive_news", state)
+        item = NewsItem(title="Good", summary="", url="https://example.com/good", source="S", relevance_score=8.0)
+        state.filtered_positive_articles = [item]
+        state.new_item_keys = state.new_item_keys + ["positive"]
+        return state
+
+    def _scrape_news(self, state):
+        self._record("scrape_news", state)
+        state.raw_articles = [{"title": "Tech"}]
+        return state
+
+    def _scrape_papers(self, state):
+        self._record("scrape_papers", state)
+        state.raw_papers = [{"title": "Paper"}]
+        return state
+
+    def _filter_articles(self, state):
+        self._record("filter_articles", state)
+        assert state.raw_articles == [{"title": "Tech"}]
+        state.new_item_keys = state.new_item_keys + ["article"]
+        return state
+
+    def _filter_papers(self, state):
+        self._record("filter_papers", state)
+        assert state.raw_papers == [{"title": "Paper"}]
+        state.new_item_keys = state.new_item_keys + ["paper"]
+        return state
+
+    def _generate_newsletter(self, state):
+        state.newsletter_content = ",".join(item.title for item in state.filtered_positive_articles)
+        return state
+
+
+def test_branches_run_concurrently_and_merge():
+    agent = SlowAgent()
+
+    started = time.monotonic()
+    content = agent.generate_newsletter(["AI"])
+    elapsed = time.monotonic() - started
+
+    # Each source is scraped then filtered, side by side: two rounds instead of five
+    assert elapsed < 4 * DELAY
+    assert content == "Good"
+    assert sorted(agent.pending_seen_keys) == ["article", "paper", "positive"]
+    starts = dict(agent.calls)
+    scrapes = [starts[name] for name in ("scrape_positive_news", "scrape_news", "scrape_papers")]
+    assert max(scrapes) - min(scrapes) < DELAY
+    assert set(agent.metrics.report()["nodes"]) == {
+        "scrape_positive_news", "scrape_news", "scrape_papers", "filter_articles", "filter_papers",
+        "generate_newsletter"
+    }
+
+
+
+class SlowPaperAgent(SlowAgent):
+    def _scrape_papers(self, state):
+        time.sleep(2 * DELAY)
+        return super()._scrape_papers(state)
+
+
+def test_filters_do_not_wait_for_other_branches():
+    agent = SlowPaperAgent()
+
+    started = time.monotonic()
+    agent.generate_newsletter(["AI"])
+    elapsed = time.monotonic() - started
+
+    starts = dict(agent.calls)
+    # Articles are filtered while papers are still being scraped
+    assert starts["filter_articles"] < starts["scrape_papers"]
+    # The paper branch alone sets the pace: 3 rounds of scraping, then filtering
+    assert elapsed < 5 * DELAY
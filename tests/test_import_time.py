@@ -0,0 +1,48 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+CREDENTIALS = ["--mistral-api-key", "test-api-key", "--email-address", "me@example.com",
+               "--email-password", "pw", "--to-email", "you@example.com"]
+# Loaded only once the agent actually runs; each takes from tens of ms to seconds to import
+HEAVY_MODULES = {"langchain_mistralai", "langchain_core", "langgraph", "feedparser", "numpy", "bs4", "requests"}
+# Generous, to absorb slow CI machines; importing the agent's dependencies up front costs several times more
+BUDGET_MS = {"config": 750, "test": 750, "run-once": 1000}
+
+
+def import_times(args):
+    """Run python -X importtime with args and return ({top-level module: cumulative ms}, all imported names)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, capture_output=True,
+                            text=True, timeout=60)
+    top_level, imported = {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imported.add(name.strip().split(".")[0])
+        if not name.startswith("  "):
+            top_level[name.strip()] = int(cumulative) / 1000
+    return top_level, imported
+
+
+COMMANDS = {
+    "config": ["main.py", "config", *CREDENTIALS],
+    # The connection test fails, so the command stops before generating anything
+    "test": ["main.py", "test", *CREDENTIALS, "--smtp-server", "127.0.0.1", "--smtp-port", "{closed_port}",
+             "--no-starttls"],
+    # Everything run-once imports before it builds the agent
+    "run-once": ["-c", "import main, myfeed.generator"],
+}
+
+
+@pytest.mark.parametrize("command", sorted(COMMANDS))
+def test_cli_imports_stay_light(command, closed_port):
+    # The port is picked when the test runs, so nothing can have taken it since collection
+    top_level, imported = import_times([arg.format(closed_port=closed_port) for arg in COMMANDS[command]])
+
+    assert top_level, "no -X importtime output"
+    assert not HEAVY_MODULES & imported
+    assert sum(top_level.values()) < BUDGET_MS[command]
@@ -0,0 +1,87 @@
+import json
+import threading
+
+import pytest
+
+from myfeed.extract import fetch_article_text
+from myfeed.fetch import FeedFetcher, create_session
+from myfeed.metrics import RunMetrics, add_bytes
+from myfeed.scoring import ScoringExecutor
+from conftest import Reply
+
+
+class UsageLLM:
+    def invoke(self, prompt):
+        return Reply("ok", {"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+
+
+def test_spans_aggregate_per_kind_and_record_errors():
+    metrics = RunMetrics()
+    with metrics.span("feed", "a") as span:
+        span.bytes = 100
+    with pytest.raises(ValueError):
+        with metrics.span("feed", "b"):
+            raise ValueError("bad feed")
+    with metrics.span("node", "scrape_news"):
+        pass
+
+    report = metrics.report()
+
+    assert report["calls"]["feed"]["count"] == 2
+    assert report["calls"]["feed"]["errors"] == 1
+    assert report["calls"]["feed"]["bytes"] == 100
+    assert report["nodes"]["scrape_news"]["peak_rss_bytes"] > 0
+    assert report["spans"][1]["error"] == "ValueError: bad feed"
+
+
+def test_add_bytes_credits_the_span_of_the_calling_thread():
+    metrics = RunMetrics()
+
+    def work(name, count):
+        with metrics.span("article", name):
+            add_bytes(count)
+
+    threads = [threading.Thread(target=work, args=(f"t{i}", i)) for i in range(1, 5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    add_bytes(1000)  # No span open: ignored
+
+    assert {span.name: span.bytes for span in metrics.spans} == {"t1": 1, "t2": 2, "t3": 3, "t4": 4}
+
+
+def test_external_calls_are_recorded(local_server):
+    metrics = RunMetrics()
+    feed = local_server.add("/feed", b"<rss>" + b"x" * 1000 + b"</rss>")
+    page = local_server.add("/page", b"<p>Hello</p>", headers={"Content-Type": "text/html"})
+    session = create_session()
+
+    FeedFetcher(session=session, metrics=metrics).fetch_all([feed])
+    with metrics.span("article", page):
+        fetch_article_text(session, page)
+    executor = ScoringExecutor(UsageLLM(), requests_per_second=0, metrics=metrics)
+    executor.invoke("prompt")
+
+    calls = metrics.report()["calls"]
+    assert calls["feed"]["bytes"] == 1011
+    assert calls["article"]["bytes"] == len(b"<p>Hello</p>")
+    assert (calls["llm"]["tokens_in"], calls["llm"]["tokens_out"]) == (120, 30)
+
+
+def test_writes_json_and_prometheus_reports(tmp_path):
+    metrics = RunMetrics()
+    with metrics.span("node", "filter_articles"):
+        pass
+    with metrics.span("llm", "invoke") as span:
+        span.tokens_in = 10
+
+    metrics.write_json(str(tmp_path / "run.json"))
+    metrics.write_prometheus(str(tmp_path / "myfeed.prom"))
+
+    report = json.loads((tmp_path / "run.json").read_text())
+    assert set(report["nodes"]) == {"filter_articles"}
+    text = (tmp_path / "myfeed.prom").read_text()
+    assert 'myfeed_node_duration_seconds{node="filter_articles"}' in text
+    assert 'myfeed_call_tokens_in{kind="llm"} 10' in text
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["myfeed.prom", "run.json"]
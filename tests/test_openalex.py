@@ -0,0 +1,104 @@
+import json
+from datetime import date
+from unittest.mock import Mock
+
+from myfeed.agent import NewsAgent, NewsletterState
+from myfeed.openalex import iter_pages, reconstruct_abstract, search_params
+
+
+class PagedSession:
+    """Fake session serving `pages` through OpenAlex cursor pagination."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def get(self, url, params, timeout):
+        self.calls.append(dict(params))
+        index = 0 if params["cursor"] == "*" else int(params["cursor"])
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else None
+        data = {"meta": {"next_cursor": next_cursor}, "results": self.pages[index][:params["per_page"]]}
+        response = Mock()
+        response.json.return_value = data
+        response.content = json.dumps(data).encode()
+        return response
+
+
+def works(prefix, count):
+    return [{"id": f"{prefix}{i}", "title": f"{prefix} paper {i}"} for i in range(count)]
+
+
+def test_iter_pages_follows_cursor_until_results_run_out():
+    session = PagedSession([works("a", 3), works("b", 3), works("c", 2)])
+
+    pages = list(iter_pages(session, search_params("AI", date(2026, 1, 1)), page_size=3, budget=100))
+
+    assert [len(page) for page in pages] == [3, 3, 2]
+    assert [call["cursor"] for call in session.calls] == ["*", "1", "2"]
+    assert session.calls[0]["filter"] == "from_publication_date:2026-01-01"
+
+
+def test_iter_pages_respects_budget_and_fetches_lazily():
+    session = PagedSession([works("a", 3), works("b", 3), works("c", 3)])
+
+    pages = iter_pages(session, search_params("AI", date(2026, 1, 1)), page_size=3, budget=5)
+    first = next(pages)
+
+    assert len(first) == 3 and len(session.calls) == 1
+    assert [len(page) for page in pages] == [2]
+    assert session.calls[1]["per_page"] == 2
+
+
+def test_stream_mode_stops_fetching_once_enough_papers_are_relevant(keyword_llm):
+    agent = NewsAgent(mistral_api_key="test-api-key")
+    agent.llm = agent.scorer.llm = keyword_llm
+    agent.scorer.limiter.rate = 0
+    agent.config.paper_stream = True
+    agent.config.paper_stream_target = 2
+    agent.config.paper_page_size = 2
+    agent.config.paper_budget = 100
+    pages = [
+        [{"id": "1", "title": "A boring paper"}, {"id": "2", "title": "A relevant paper"}],
+        [{"id": "3", "title": "Another relevant paper"}, {"id": "4", "title": "Dull"}],
+        [{"id": "5", "title": "Never fetched"}],
+    ]
+    agent.session = PagedSession(pages)
+
+    state = agent._scrape_papers(NewsletterState(topics=["AI"]))
+    state = agent._filter_papers(state)
+
+    assert len(agent.session.calls) == 2
+    assert [paper["id"] for paper in state.raw_papers] == ["1", "2", "3", "4"]
+    assert sorted(paper.title for paper in state.filtered_papers) == ["A relevant paper", "Another relevant paper"]
+    assert sorted(state.new_item_keys) == ["2", "3"]
+
+
+def sort_based_abstract(inverted_index, max_chars=1000):
+    """The original implementation, as a reference."""
+    word_positions = sorted((pos, word) for word, positions in inverted_index.items() for pos in positions)
+    return " ".join(word for _, word in word_positions)[:max_chars]
+
+
+def test_reconstruct_abstract_matches_sort_based_reference():
+    text = "the quick brown fox jumps over the lazy dog and the dog sleeps " * 30
+    index = {}
+    for position, word in enumerate(text.split()):
+        index.setdefault(word, []).append(position)
+
+    for max_chars in (0, 1, 10, 57, 1000, 100_000):
+        assert reconstruct_abstract(index, max_chars) == sort_based_abstract(index, max_chars)
+
+
+def test_reconstruct_abstract_handles_gaps_and_malformed_entries():
+    index = {"world": [5], "Hello": [0], "bad": ["x", -1, None], "dup": [0], 42: [1], "list": "notalist"}
+
+    assert reconstruct_abstract(index) == "Hello world"
+    assert reconstruct_abstract({"far": [10 ** 9], "near": [3]}) == "near far"
+    assert reconstruct_abstract(None) == ""
+    assert reconstruct_abstract(["not", "a", "dict"]) == ""
+
+
+def test_reconstruct_abstract_rejects_negative_and_bool_positions_in_complete_indexes():
+    # Both fill every slot of a 3-word index, so only a position check catches them
+    assert reconstruct_abstract({"a": [0], "b": [1], "c": [-1]}) == "a b"
+    assert reconstruct_abstract({"a": [0], "b": [True], "c": [2]}) == "a c"
@@ -0,0 +1,43 @@
+import numpy as np
+
+from myfeed.prefilter import bm25_scores, select_candidates, tokenize
+
+DOCUMENTS = [
+    "New AI model beats AI benchmarks",
+    "Python 3.14 released",
+    "How to bake sourdough",
+    "AI tooling for Python developers",
+]
+
+
+def test_tokenize_lowercases_and_drops_stopwords_and_plurals():
+    assert tokenize("The Startups of AI, in 2026!") == ["startup", "ai", "2026"]
+    assert tokenize("class glass") == ["class", "glass"]
+
+
+def test_bm25_scores_rank_matching_documents():
+    scores = bm25_scores(DOCUMENTS, ["AI", "Python"])
+
+    assert scores.shape == (2, 4)
+    assert scores[0, 2] == scores[1, 2] == 0
+    # Repeating the term raises the score, but less than linearly
+    assert scores[0, 0] > scores[0, 3] > 0
+    assert scores[1, 1] > 0 and scores[1, 0] == 0
+
+
+def test_bm25_scores_handles_empty_inputs():
+    assert bm25_scores([], ["AI"]).shape == (1, 0)
+    assert not bm25_scores(DOCUMENTS, ["the of"]).any()
+
+
+def test_select_candidates_by_top_k_and_threshold():
+    scores = np.array([
+        [3.0, 0.0, 0.0, 1.0],
+        [0.0, 2.0, 0.0, 0.5],
+    ])
+
+    assert select_candidates(scores, top_k=1) == [0, 1]
+    assert select_candidates(scores, top_k=2) == [0, 1, 3]
+    assert select_candidates(scores, top_k=0, min_score=1.0) == [0, 1, 3]
+    # Items matching no topic at all are never selected
+    assert 2 not in select_candidates(scores, top_k=4)
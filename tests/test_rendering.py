@@ -0,0 +1,69 @@
+from datetime import datetime
+from email import message_from_bytes
+from unittest.mock import patch
+
+from myfeed.email_sender import EmailSender
+from myfeed.models import NewsletterContent, StructuredArticle, StructuredPaper
+from myfeed.rendering import render_html, render_text
+
+
+def make_newsletter(**overrides):
+    article = StructuredArticle(title="Rockets <are> back", source="Example", summary="A launch.",
+                                url="https://example.com/r?a=1&b=2", relevance_score=8.0)
+    paper = StructuredPaper(title="On rockets", authors="A. Author", year="2026", citations="3",
+                            summary="We study rockets.", url="https://doi.org/1", relevance_score=9.0)
+    fields = dict(introduction="Hey", positive_news=[], latest_news=[article], todays_papers=[],
+                  recent_papers=[paper], closing_note="Bye")
+    return NewsletterContent(**dict(fields, **overrides))
+
+
+def test_text_keeps_the_markdown_layout():
+    assert render_text(make_newsletter()) == "\n".join([
+        "Hey",
+        "",
+        "## Tech News",
+        "",
+        "1. **Rockets <are> back** (Score: 8.0)",
+        "   Source: Example",
+        "   Summary: A launch.",
+        "   [Read more](https://example.com/r?a=1&b=2)",
+        "",
+        "## Today's Papers",
+        "",
+        "No papers published today.",
+        "",
+        "## Recent Papers (Last 2 Weeks)",
+        "",
+        "1. **On rockets** (Score: 9.0)",
+        "   Authors: A. Author",
+        "   Year: 2026",
+        "   Citations: 3",
+        "   Summary: We study rockets.",
+        "   [Read paper](https://doi.org/1)",
+        "",
+        "Bye",
+    ])
+
+
+def test_html_wraps_items_in_styled_blocks_and_escapes_fields():
+    html = render_html(make_newsletter(), generated=datetime(2026, 10, 17, 8, 30))
+
+    assert '<div class="article"><p>1. <strong>Rockets &lt;are&gt; back</strong> (Score: 8.0)' in html
+    assert '<a href="https://example.com/r?a=1&amp;b=2">Read more</a>' in html
+    assert html.count('<div class="paper">') == 1 and '<p class="paper-meta">Authors: A. Author<br>' in html
+    assert "<p>No papers published today.</p>" in html
+    assert "Positive News" not in html.split("<body>")[1]
+    assert "Generated on October 17, 2026 at 08:30 AM" in html
+
+
+def test_sends_structured_newsletter_without_reparsing_text(smtp_server):
+    sender = EmailSender("127.0.0.1", smtp_server.port, "me@example.com", "pw", "you@example.com", use_tls=False)
+    newsletter = make_newsletter()
+
+    with patch.object(sender, "_convert_to_html", side_effect=AssertionError("re-parsed")):
+        assert sender.send_newsletter(newsletter, subject="Today")
+
+    message = message_from_bytes(smtp_server.messages[0][2])
+    text, html = (part.get_payload(decode=True).decode() for part in message.get_payload())
+    assert text == render_text(newsletter)
+    assert '<div class="article">' in html
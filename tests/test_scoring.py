@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from myfeed.scoring import ScoringExecutor, TokenBucket, parse_batch_results, plan_batches
+from conftest import Reply
+
+
+class HTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"status {status}")
+        self.response = type("Response", (), {"status_code": status, "headers": headers or {}})()
+
+
+class SlowLLM:
+    """Echoes the prompt after a delay, tracking how many calls overlap."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return Reply(prompt)
+
+
+class FlakyLLM:
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return Reply("ok")
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    started = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    # The first token is free, the other five take 1/20s each
+    assert time.monotonic() - started >= 0.24
+
+
+def test_map_runs_calls_concurrently_up_to_the_cap_and_keeps_order():
+    llm = SlowLLM()
+    executor = ScoringExecutor(llm, max_concurrency=3, requests_per_second=0)
+
+    started = time.monotonic()
+    replies = executor.map([f"prompt {i}" for i in range(6)])
+
+    assert time.monotonic() - started < 0.6
+    assert llm.peak == 3
+    assert [reply.content for reply in replies] == [f"prompt {i}" for i in range(6)]
+
+
+def test_cap_holds_across_parallel_map_calls():
+    llm = SlowLLM(delay=0.1)
+    executor = ScoringExecutor(llm, max_concurrency=3, requests_per_second=0)
+
+    # Like the article and paper filters, which run in parallel graph branches
+    threads = [threading.Thread(target=executor.map, args=([f"prompt {i}" for i in range(6)],)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert llm.peak == 3
+
+
+def test_retries_rate_limit_and_server_errors():
+    llm = FlakyLLM([HTTPError(429), HTTPError(503)])
+    executor = ScoringExecutor(llm, requests_per_second=0, backoff_base=0.01)
+
+    assert executor.invoke("prompt").content == "ok"
+    assert llm.calls == 3
+
+
+def test_honours_retry_after():
+    llm = FlakyLLM([HTTPError(429, {"retry-after": "0.2"})])
+    executor = ScoringExecutor(llm, requests_per_second=0, backoff_base=0)
+
+    started = time.monotonic()
+    executor.invoke("prompt")
+
+    assert time.monotonic() - started >= 0.2
+
+
+def test_does_not_retry_client_errors():
+    llm = FlakyLLM([HTTPError(400)])
+    executor = ScoringExecutor(llm, requests_per_second=0)
+
+    with pytest.raises(HTTPError):
+        executor.invoke("prompt")
+    assert llm.calls == 1
+
+
+def test_map_returns_none_for_failed_calls():
+    llm = FlakyLLM([HTTPError(401)])
+    executor = ScoringExecutor(llm, max_concurrency=1, requests_per_second=0)
+
+    replies = executor.map(["a", "b"])
+
+    assert replies[0] is None
+    assert replies[1].content == "ok"
+
+
+def test_plan_batches_respects_item_and_token_limits():
+    assert plan_batches([10] * 5, max_items=2, max_tokens=1000) == [[0, 1], [2, 3], [4]]
+    assert plan_batches([40, 40, 40, 10], max_items=10, max_tokens=100, overhead=10) == [[0, 1], [2, 3]]
+    # An item larger than the budget still gets scored, on its own
+    assert plan_batches([10, 500, 10], max_items=10, max_tokens=100) == [[0], [1], [2]]
+
+
+def test_parse_batch_results_skips_malformed_entries():
+    data = [
+        {"id": 1, "relevance_score": 7, "summary": "fine"},
+        {"id": "2", "relevance_score": "3.5", "summary": "string id and score"},
+        {"id": 3, "summary": "no score"},
+        {"id": 9, "relevance_score": 5, "summary": "unknown id"},
+        "garbage",
+    ]
+
+    assert parse_batch_results(data, size=3) == {
+        1: {"relevance_score": 7.0, "summary": "fine"},
+        2: {"relevance_score": 3.5, "summary": "string id and score"},
+    }
+    assert parse_batch_results({"results": data[:1]}, size=1) == {1: {"relevance_score": 7.0, "summary": "fine"}}
+    assert parse_batch_results(None, size=3) == {}
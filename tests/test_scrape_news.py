@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from myfeed.agent import NewsAgent, NewsletterState
+from myfeed.config import AgentConfig
+from myfeed.fetch import canonical_url
+
+ARTICLE = b"<html><body><p>%s</p></body></html>"
+
+
+def make_feed(server, name, links):
+    items = "".join(f"<item><title>{link}</title><link>{link}</link></item>" for link in links)
+    body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>{items}</channel></rss>'
+    return server.add(f"/{name}.xml", body.encode())
+
+
+@pytest.fixture
+def news_agent():
+    return NewsAgent(mistral_api_key="test-api-key")
+
+
+def test_extract_contents_runs_concurrently_and_keeps_order(news_agent, local_server):
+    urls = [local_server.add(f"/a{i}", ARTICLE % f"article {i}".encode(), delay=0.3) for i in range(6)]
+
+    started = time.monotonic()
+    contents = news_agent._extract_contents(urls)
+
+    assert time.monotonic() - started < 1.2
+    assert contents == [f"article {i}" for i in range(6)]
+
+
+def test_scrape_news_extracts_bodies_for_all_feeds(news_agent, local_server):
+    links = [local_server.add(f"/post{i}", ARTICLE % f"body {i}".encode()) for i in range(4)]
+    news_agent.news_sources = [
+        make_feed(local_server, "one", links[:2]),
+        make_feed(local_server, "two", links[2:]),
+    ]
+
+    state = news_agent._scrape_news(NewsletterState(topics=["AI"]))
+
+    assert [a["source"] for a in state.raw_articles] == ["one", "one", "two", "two"]
+    assert [a["content"] for a in state.raw_articles] == [f"body {i}" for i in range(4)]
+
+
+def test_extracted_text_is_cached_across_runs(local_server, tmp_path):
+    url = local_server.add("/story", ARTICLE % b"cached body")
+    config = AgentConfig(cache_dir=str(tmp_path))
+
+    assert NewsAgent(mistral_api_key="test-api-key", config=config)._extract_content(url) == "cached body"
+    local_server.routes.clear()
+
+    second_run = NewsAgent(mistral_api_key="test-api-key", config=config)
+    assert second_run._extract_content(url + "?utm_source=rss") == "cached body"
+    assert second_run.article_cache.hits == 1
+
+
+def test_failed_extractions_are_not_cached(local_server, tmp_path):
+    url = local_server.add("/flaky", b"", status=503)
+    agent = NewsAgent(mistral_api_key="test-api-key", config=AgentConfig(cache_dir=str(tmp_path)))
+
+    assert agent._extract_content(url) == ""
+    assert len(agent.article_cache) == 0
+
+
+def test_scrape_nodes_skip_items_from_earlier_newsletters(local_server, tmp_path):
+    links = [local_server.add(f"/post{i}", ARTICLE % f"body {i}".encode()) for i in range(3)]
+    feed = make_feed(local_server, "feed", links)
+    agent = NewsAgent(mistral_api_key="test-api-key", config=AgentConfig(cache_dir=str(tmp_path)))
+    agent.news_sources = [feed]
+    agent.positive_news_sources = [feed]
+    agent.seen_store.add([canonical_url(links[0] + "?utm_medium=email")])
+
+    state = agent._scrape_news(NewsletterState(topics=["AI"]))
+    state = agent._scrape_positive_news(state)
+
+    assert [a["url"] for a in state.raw_articles] == links[1:]
+    # The newest positive story was already sent, so the next one is picked
+    assert [a.url for a in state.filtered_positive_articles] == [links[1]]
+    # The positive story is already in the newsletter; articles are recorded once they make the cut
+    assert state.new_item_keys == links[1:2]
+
+
+def test_mark_seen_commits_pending_keys(tmp_path):
+    agent = NewsAgent(mistral_api_key="test-api-key", config=AgentConfig(cache_dir=str(tmp_path)))
+    agent.pending_seen_keys = ["https://example.com/a"]
+
+    agent.mark_seen()
+
+    assert agent.seen_store.seen(["https://example.com/a"]) == {"https://example.com/a"}
+    assert agent.pending_seen_keys == []
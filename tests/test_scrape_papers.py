@@ -1,3 +1,6 @@
+import json
+import time
+from datetime import date, timedelta
 import pytest
 from unittest.mock import Mock, patch
 from myfeed.agent import NewsAgent, NewsletterState
@@ -7,7 +10,7 @@ from myfeed.agent import NewsAgent, NewsletterState
 def news_agent():
     """Create a NewsAgent instance for testing."""
     # Use a dummy API key for testing
-    return NewsAgent(openai_api_key="test-api-key")
+    return NewsAgent(mistral_api_key="test-api-key")
 
 
 @pytest.fixture
@@ -118,18 +121,19 @@ def mock_openalex_response():
 def test_scrape_papers_success(news_agent, newsletter_state, mock_openalex_response):
     """Test successful paper scraping from OpenAlex API for AI and ADME topics."""
 
-    with patch('requests.get') as mock_get:
-        # Mock the requests.get response
+    with patch.object(news_agent.session, 'get') as mock_get:
+        # Mock the session.get response
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_openalex_response
+        mock_response.content = json.dumps(mock_openalex_response).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
         # Call the _scrape_papers method
         result_state = news_agent._scrape_papers(newsletter_state)
 
-        # Verify that requests.get was called for each topic
+        # Verify that session.get was called for each topic
         assert mock_get.call_count == len(newsletter_state.topics)
 
         # Check that the URLs contain the expected API endpoint
@@ -157,7 +161,7 @@ def test_scrape_papers_success(news_agent, newsletter_state, mock_openalex_respo
 def test_scrape_papers_with_network_error(news_agent, newsletter_state):
     """Test paper scraping handles network errors gracefully."""
 
-    with patch('requests.get') as mock_get:
+    with patch.object(news_agent.session, 'get') as mock_get:
         # Simulate a network error
         mock_get.side_effect = Exception("Network timeout")
 
@@ -171,11 +175,12 @@ def test_scrape_papers_with_network_error(news_agent, newsletter_state):
 def test_scrape_papers_with_empty_response(news_agent, newsletter_state):
     """Test paper scraping handles empty API response gracefully."""
 
-    with patch('requests.get') as mock_get:
+    with patch.object(news_agent.session, 'get') as mock_get:
         # Mock empty response
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {"meta": {}, "results": []}
+        mock_response.content = b'{"meta": {}, "results": []}'
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -190,10 +195,11 @@ def test_scrape_papers_with_empty_response(news_agent, newsletter_state):
 def test_scrape_papers_extracts_authors_correctly(news_agent, newsletter_state, mock_openalex_response):
     """Test that authors are extracted and formatted correctly."""
 
-    with patch('requests.get') as mock_get:
+    with patch.object(news_agent.session, 'get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_openalex_response
+        mock_response.content = json.dumps(mock_openalex_response).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -212,10 +218,11 @@ def test_scrape_papers_extracts_authors_correctly(news_agent, newsletter_state,
 def test_scrape_papers_extracts_citations(news_agent, newsletter_state, mock_openalex_response):
     """Test that citation counts are extracted correctly."""
 
-    with patch('requests.get') as mock_get:
+    with patch.object(news_agent.session, 'get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_openalex_response
+        mock_response.content = json.dumps(mock_openalex_response).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -272,7 +279,7 @@ def test_scrape_papers_filters_empty_values(news_agent, newsletter_state):
         ]
     }
 
-    with patch('requests.get') as mock_get:
+    with patch.object(news_agent.session, 'get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = response_with_missing_data
@@ -291,10 +298,11 @@ def test_scrape_papers_filters_empty_values(news_agent, newsletter_state):
 def test_scrape_papers_uses_polite_pool(news_agent, newsletter_state, mock_openalex_response):
     """Test that requests include mailto parameter for polite pool."""
 
-    with patch('requests.get') as mock_get:
+    with patch.object(news_agent.session, 'get') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_openalex_response
+        mock_response.content = json.dumps(mock_openalex_response).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -307,5 +315,85 @@ def test_scrape_papers_uses_polite_pool(news_agent, newsletter_state, mock_opena
             assert 'mailto' in params
 
 
+def openalex_reply(works):
+    """Mock OpenAlex response holding the given works."""
+    data = {"meta": {}, "results": works}
+    response = Mock()
+    response.json.return_value = data
+    response.content = json.dumps(data).encode()
+    response.raise_for_status = Mock()
+    return response
+
+
+def test_scrape_papers_searches_topics_concurrently(news_agent):
+    """Test that topics are searched in parallel and papers keep topic order."""
+    topics = ["AI", "ADME", "Climate", "Robotics"]
+
+    def slow_get(url, params, timeout):
+        time.sleep(0.3)
+        return openalex_reply([{"id": f"W-{params['search']}", "title": f"Paper on {params['search']}"}])
+
+    with patch.object(news_agent.session, 'get', side_effect=slow_get):
+        started = time.monotonic()
+        result_state = news_agent._scrape_papers(NewsletterState(topics=topics))
+        elapsed = time.monotonic() - started
+
+    assert elapsed < 0.3 * len(topics) / 2
+    assert [paper["topics"] for paper in result_state.raw_papers] == [[topic] for topic in topics]
+
+
+def test_scrape_papers_combined_search_attributes_topics(news_agent):
+    """Test that a single OR-search is sent and papers are attributed to their best topic."""
+    news_agent.config.openalex_combined_search = True
+    works = [
+        {"id": "W1", "title": "Deep learning for protein folding"},
+        {"id": "W2", "title": "Predicting ADME properties of drugs"},
+        {"id": "W3", "title": "A survey of everything"},
+    ]
+
+    with patch.object(news_agent.session, 'get', return_value=openalex_reply(works)) as mock_get:
+        result_state = news_agent._scrape_papers(NewsletterState(topics=["deep learning", "ADME"]))
+
+    assert mock_get.call_count == 1
+    assert mock_get.call_args.kwargs["params"]["search"] == "(deep learning) OR (ADME)"
+    assert mock_get.call_args.kwargs["params"]["per_page"] == 20
+    assert [paper["topics"] for paper in result_state.raw_papers] == [
+        ["deep learning"], ["ADME"], ["deep learning", "ADME"]
+    ]
+
+
+def test_scrape_papers_requests_recent_papers_and_used_fields_only(news_agent, newsletter_state):
+    """Test that OpenAlex is asked for papers inside the newsletter window, with a field projection."""
+    news_agent.config.paper_window_days = 7
+
+    with patch.object(news_agent.session, 'get', return_value=openalex_reply([])) as mock_get:
+        news_agent._scrape_papers(newsletter_state)
+
+    params = mock_get.call_args.kwargs["params"]
+    assert params["filter"] == f"from_publication_date:{date.today() - timedelta(days=7)}"
+    assert set(params["select"].split(",")) >= {"id", "title", "authorships", "abstract_inverted_index"}
+    assert "concepts" not in params["select"]
+
+
+def test_scrape_papers_merges_works_found_by_several_topics(news_agent):
+    """Test that a work returned for two topics is kept once, with both topics."""
+    replies = {
+        "AI": [{"id": "W1", "doi": "https://doi.org/10.1/X", "title": "Shared"}, {"id": "W2", "title": "AI only"}],
+        "ADME": [{"id": "W9", "doi": "https://doi.org/10.1/x", "title": "Shared (other record)"},
+                 {"id": "W1", "title": "Shared"}, {"id": "W3", "title": "ADME only"}],
+    }
+
+    def get(url, params, timeout):
+        return openalex_reply(replies[params["search"]])
+
+    with patch.object(news_agent.session, 'get', side_effect=get):
+        result_state = news_agent._scrape_papers(NewsletterState(topics=["AI", "ADME"]))
+
+    assert [(paper["id"], paper["topics"]) for paper in result_state.raw_papers] == [
+        ("W1", ["AI", "ADME"]), ("W2", ["AI"]), ("W3", ["ADME"])
+    ]
+    assert result_state.new_item_keys == []  # Recorded once a newsletter shows them
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,115 @@
+import smtplib
+import threading
+import time
+
+from myfeed.config import AgentConfig
+from myfeed.email_sender import EmailSender
+from myfeed.generator import NewsletterGenerator
+from myfeed.spool import MailSpool, SpoolWorker, is_permanent
+
+
+def make_sender(port, to_email="you@example.com"):
+    return EmailSender("127.0.0.1", port, "me@example.com", "pw", to_email, use_tls=False, timeout=5)
+
+
+def test_messages_persist_until_sent(tmp_path):
+    path = str(tmp_path / "mail.sqlite")
+    writer = MailSpool(path)
+    message_id = writer.enqueue("a@example.com", b"Subject: hi\r\n\r\nHey")
+    writer.close()
+
+    spool = MailSpool(path)
+    claimed = spool.claim()
+
+    assert [(m.id, m.recipient, m.message, m.attempts) for m in claimed] == [
+        (message_id, "a@example.com", b"Subject: hi\r\n\r\nHey", 0)
+    ]
+    # Claimed messages are hidden from other workers until their lease runs out
+    assert spool.claim() == []
+    spool.sent(message_id)
+    assert len(spool) == 0 and spool.next_due() is None
+    spool.close()
+
+
+def test_failures_back_off_then_give_up(tmp_path):
+    spool = MailSpool(str(tmp_path / "mail.sqlite"), max_attempts=3, retry_base=10, retry_max=15)
+    message_id = spool.enqueue("a@example.com", b"Hey")
+
+    started = time.time()
+    assert spool.failed(message_id, "timeout")
+    assert 10 <= spool.next_due() - started < 11
+    assert spool.failed(message_id, "timeout")
+    assert 15 <= spool.next_due() - started < 16  # Capped at retry_max
+    assert not spool.failed(message_id, "timeout")
+
+    assert spool.pending() == 0 and spool.next_due() is None
+    assert [(m.id, m.attempts) for m in spool.dead()] == [(message_id, 3)]
+    spool.close()
+
+
+def test_permanent_failures_are_not_retried(tmp_path):
+    spool = MailSpool(str(tmp_path / "mail.sqlite"))
+    message_id = spool.enqueue("a@example.com", b"Hey")
+
+    assert not spool.failed(message_id, "550 No such user", permanent=True)
+    assert len(spool.dead()) == 1
+    spool.close()
+
+
+def test_classifies_smtp_errors():
+    assert is_permanent(smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"No such user")}))
+    assert not is_permanent(smtplib.SMTPRecipientsRefused({"a@example.com": (451, b"Try later")}))
+    assert is_permanent(smtplib.SMTPDataError(554, b"Rejected"))
+    assert not is_permanent(smtplib.SMTPAuthenticationError(535, b"Bad credentials"))
+    assert not is_permanent(ConnectionRefusedError())
+
+
+def test_worker_drains_over_several_connections(tmp_path, smtp_server):
+    spool = MailSpool(str(tmp_path / "mail.sqlite"))
+    recipients = [f"reader{i}@example.com" for i in range(6)]
+    make_sender(smtp_server.port, ",".join(recipients)).enqueue("Hey\n\nBye", spool, subject="Today")
+
+    delivered = SpoolWorker(spool, make_sender(smtp_server.port), workers=2).drain()
+
+    assert delivered == 6 and len(spool) == 0
+    assert smtp_server.connections == 2
+    assert sorted(message[1][0] for message in smtp_server.messages) == recipients
+    assert all(message[0] == "me@example.com" for message in smtp_server.messages)
+    spool.close()
+
+
+def test_worker_retries_temporary_failures_within_timeout(tmp_path, smtp_server):
+    smtp_server.reject = {"a@example.com"}
+    smtp_server.reject_reply = "451 Try again later"
+    spool = MailSpool(str(tmp_path / "mail.sqlite"), retry_base=0.2)
+    spool.enqueue("a@example.com", b"Subject: hi\r\n\r\nHey")
+    threading.Timer(0.1, smtp_server.reject.clear).start()
+
+    delivered = SpoolWorker(spool, make_sender(smtp_server.port)).drain(timeout=5)
+
+    assert delivered == 1 and len(spool) == 0
+    assert len(smtp_server.messages) == 1
+    spool.close()
+
+
+def test_generator_keeps_newsletter_in_spool_when_server_is_down(tmp_path, smtp_server, closed_port, request):
+    config = AgentConfig(cache_dir=str(tmp_path), mail_drain_timeout=0, mail_retry_base=0)
+    sender = make_sender(closed_port, "a@example.com,b@example.com")
+    generator = NewsletterGenerator("test-api-key", sender, ["space"], config=config)
+    request.addfinalizer(generator.spool.close)
+    runs = []
+    generator.agent.generate_newsletter = lambda topics: runs.append(topics) or "Hey\n\nBye"
+    generator.agent.mark_seen = lambda: runs.append("seen")
+
+    generator.run()
+
+    assert runs == [["space"], "seen"]
+    assert generator.spool.pending() == 2
+
+    # The next run delivers the stored messages without regenerating them
+    sender.smtp_port = smtp_server.port
+    generator.agent.generate_newsletter = lambda topics: ""
+    generator.run()
+
+    assert generator.spool.pending() == 0
+    assert sorted(message[1][0] for message in smtp_server.messages) == ["a@example.com", "b@example.com"]